@@ -1,87 +1,263 @@
-from flask import Flask, render_template, request, redirect, url_for, flash
-import pandas as pd
+from flask import Flask, render_template, request, redirect, url_for, flash, jsonify
+from flask.json.provider import JSONProvider
+from bson import ObjectId
+import orjson
 import logging
+import functools
+import threading
+import uuid
+import hashlib
+import itertools
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
 
 # Import your custom modules
+# NOTE: sentiment/visualizer/preprocessor pull in torch, transformers, matplotlib
+# and NLTK, so they are imported inside their accessors below, not here.
 from src.database import NewsDatabase
-from src.scraper import NewsScraper
-from src.sentiment import SentimentAnalyzer
-from src.preprocessor import TextPreprocessor
-from src.visualizer import SentimentVisualizer
 from config.config import Config
 
 # Configure Logging
 logging.basicConfig(level=Config.LOG_LEVEL, format=Config.LOG_FORMAT)
 logger = logging.getLogger(__name__)
 
+
+def _orjson_default(obj):
+    """Serialize types orjson doesn't know natively (Mongo ObjectIds)"""
+    if isinstance(obj, ObjectId):
+        return str(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    """Flask JSON provider backed by orjson (native datetime/numpy support)"""
+    OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_NAIVE_UTC | orjson.OPT_SERIALIZE_NUMPY
+
+    def dumps(self, obj, **kwargs):
+        return orjson.dumps(obj, option=self.OPTIONS, default=_orjson_default).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+
 # Initialize Flask App
 app = Flask(__name__)
+app.json = OrjsonProvider(app)
 app.secret_key = 'super_secret_key_for_flash_messages'  # Change this for production
 
 # Initialize System Components
-# We do this globally so connections stay open
+# Only the database is created eagerly (the home page needs it). Everything else
+# is built on first use so that hitting '/' never pays for loading DistilBERT.
 try:
     Config.setup_directories()  # Ensure static/images exists
     db_manager = NewsDatabase()
-    scraper = NewsScraper()
-    analyzer = SentimentAnalyzer()
-    
-    # --- NEW: Train Logistic Regression on startup if data exists ---
-    logger.info("Checking for existing data to train Logistic Regression model...")
-    existing_data = db_manager.get_articles({'sentiment_label': {'$exists': True}}, limit=0)
-    if existing_data:
-        train_msg = analyzer.train_on_db(existing_data)
-        logger.info(f"Startup Training: {train_msg}")
-    else:
-        logger.info("No labeled data found for startup training. Model will start empty.")
-    # ----------------------------------------------------------------
-    
-    preprocessor = TextPreprocessor()
-    visualizer = SentimentVisualizer()
 except Exception as e:
     logger.error(f"Failed to initialize components: {e}")
 
+
+def _train_on_startup(analyzer):
+    """Train Logistic Regression on existing labels (runs in a background thread)"""
+    try:
+        logger.info("Checking for existing data to train Logistic Regression model...")
+        train_msg = analyzer.train_on_db(db_manager.iter_training_rows())
+        if train_msg:
+            logger.info(f"Startup Training: {train_msg}")
+        else:
+            logger.info("No labeled data found for startup training. Model will start empty.")
+    except Exception as e:
+        logger.error(f"Startup training failed: {e}")
+
+
+_analyzer = None
+_analyzer_lock = threading.Lock()
+
+
+def get_analyzer():
+    """Load the sentiment analyzer on first use and kick off startup training"""
+    global _analyzer
+    # Double-checked so concurrent first requests build one analyzer (one DistilBERT
+    # load) and start one training thread; lru_cache doesn't serialize the first call
+    if _analyzer is None:
+        with _analyzer_lock:
+            if _analyzer is None:
+                from src.sentiment import SentimentAnalyzer
+                analyzer = SentimentAnalyzer()
+                # Reuse the last saved Logistic Regression model right away; the background
+                # pass only retrains if the labeled data has changed since it was saved
+                analyzer.load_latest_model()
+                threading.Thread(target=_train_on_startup, args=(analyzer,), daemon=True).start()
+                _analyzer = analyzer
+    return _analyzer
+
+
+@functools.lru_cache(maxsize=1)
+def get_scraper():
+    """Create the news scraper on first use"""
+    from src.scraper import NewsScraper
+    return NewsScraper()
+
+
+@functools.lru_cache(maxsize=1)
+def get_preprocessor():
+    """Create the text preprocessor on first use"""
+    from src.preprocessor import TextPreprocessor
+    return TextPreprocessor()
+
+
+@functools.lru_cache(maxsize=1)
+def get_visualizer():
+    """Create the visualizer on first use"""
+    from src.visualizer import SentimentVisualizer
+    return SentimentVisualizer()
+
+
+# --------------------------------------------------------------------------
+# BACKGROUND JOBS
+# --------------------------------------------------------------------------
+# Scraping and analysis take seconds to minutes, so they run off the request
+# thread and the UI polls /job/<id>. Scraping is network-bound, so several can
+# overlap. Analysis also uses a thread (PyTorch releases the GIL during
+# inference and the analyzer/DB client can't be shared across processes);
+# a single worker keeps two runs from analyzing the same pending articles.
+executor_io = ThreadPoolExecutor(max_workers=4)
+executor_cpu = ThreadPoolExecutor(max_workers=1)
+
+MAX_TRACKED_JOBS = 100
+jobs = OrderedDict()  # job_id -> Future resolving to (flash category, message)
+jobs_lock = threading.Lock()
+
+
+def submit_job(executor, fn, *args):
+    """Run fn in the background and return a job id for polling"""
+    job_id = uuid.uuid4().hex[:12]
+    future = executor.submit(fn, *args)
+    with jobs_lock:
+        jobs[job_id] = future
+        # Forget the oldest finished jobs so the table stays bounded
+        while len(jobs) > MAX_TRACKED_JOBS:
+            oldest_id, oldest = next(iter(jobs.items()))
+            if not oldest.done():
+                break
+            jobs.pop(oldest_id)
+    return job_id
+
+
+def batched(iterable, size):
+    """Yield lists of up to `size` items from any iterable (e.g. a DB cursor)"""
+    iterator = iter(iterable)
+    while batch := list(itertools.islice(iterator, size)):
+        yield batch
+
+
+# Fields rendered by the article table in index.html (skips the large 'content' blob)
+INDEX_PROJECTION = {
+    'title': 1, 'url': 1, 'source': 1, 'sentiment_label': 1,
+    'sentiment_score': 1, 'published_date': 1, 'scraped_at': 1, '_id': 0
+}
+
+# Fields used by SentimentVisualizer
+VISUALIZE_PROJECTION = {
+    'title': 1, 'source': 1, 'sentiment_label': 1,
+    'sentiment_score': 1, 'scraped_at': 1, '_id': 0
+}
+
+
+def stats_fingerprint(sentiment_stats: dict, source_stats: dict) -> str:
+    """Short hash of the aggregate statistics, independent of $group output order"""
+    def by_id(item):
+        return str(item.get('_id'))
+    
+    canonical = {
+        'sentiment': {**sentiment_stats,
+                      'by_sentiment': sorted(sentiment_stats.get('by_sentiment', []), key=by_id)},
+        'source': sorted(source_stats.get('by_source', []), key=by_id)
+    }
+    encoded = orjson.dumps(canonical, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS,
+                           default=_orjson_default)
+    return hashlib.blake2b(encoded, digest_size=6).hexdigest()
+
+
+def get_article_page(page: int = 1) -> dict:
+    """Fetch one page of the article list (newest first) plus pager flags for index.html"""
+    page = max(page, 1)
+    size = Config.ARTICLES_PER_PAGE
+    # Ask for one extra row to learn whether a next page exists
+    articles = db_manager.get_articles(limit=size + 1, skip=(page - 1) * size,
+                                       projection=INDEX_PROJECTION,
+                                       sort=[('scraped_at', -1)])
+    return {
+        'articles': articles[:size],
+        'page': page,
+        'has_prev': page > 1,
+        'has_next': len(articles) > size
+    }
+
+
 # --------------------------------------------------------------------------
 # ROUTES
 # --------------------------------------------------------------------------
 
 @app.route('/')
 def index():
-    """Home page: Shows controls, stats, and ALL articles"""
+    """Home page: Shows controls, stats, and a page of articles"""
     try:
         # Get statistics
         stats = db_manager.get_sentiment_statistics()
         
-        # Get all articles to verify scraping
-        recent_articles = db_manager.get_articles(limit=0)
+        # Get the requested page of articles to verify scraping
+        page = request.args.get('page', 1, type=int)
         
         return render_template('index.html', 
                              stats=stats, 
-                             articles=recent_articles)
+                             job_id=request.args.get('job'),
+                             **get_article_page(page))
     except Exception as e:
         flash(f"Error loading dashboard: {e}", "danger")
         return render_template('index.html', stats={}, articles=[])
 
 
-@app.route('/scrape', methods=['POST'])
-def scrape():
-    """Trigger the news scraper (BBC/Reuters)"""
+@app.route('/job/<job_id>')
+def job_status(job_id):
+    """Report the status of a background scrape/analysis job"""
+    with jobs_lock:
+        future = jobs.get(job_id)
+    
+    if future is None:
+        return jsonify({'status': 'unknown'}), 404
+    if future.running():
+        return jsonify({'status': 'running'})
+    if not future.done():
+        return jsonify({'status': 'pending'})
+    
+    category, message = future.result()
+    return jsonify({'status': 'done', 'category': category, 'message': message})
+
+
+def run_scrape():
+    """Scrape all sources and save new articles (runs in the background)"""
     try:
-        logger.info("Manual scrape triggered from UI")
-        articles = scraper.scrape_all_sources()
+        articles = get_scraper().scrape_all_sources()
+        
+        if not articles:
+            return "warning", "⚠️ Scraper ran but found no new articles."
+        
+        count = db_manager.insert_articles_bulk(articles)
+        db_manager.invalidate_stats()
+        return "success", f"✅ Successfully scraped and saved {count} new articles!"
         
-        if articles:
-            count = db_manager.insert_articles_bulk(articles)
-            flash(f"✅ Successfully scraped and saved {count} new articles!", "success")
-        else:
-            flash("⚠️ Scraper ran but found no new articles.", "warning")
-            
     except Exception as e:
         logger.error(f"Scraping error: {e}")
-        flash(f"❌ Error during scraping: {str(e)}", "danger")
-        
-    return redirect(url_for('index'))
+        return "danger", f"❌ Error during scraping: {str(e)}"
+
+
+@app.route('/scrape', methods=['POST'])
+def scrape():
+    """Trigger the news scraper (BBC/Reuters)"""
+    logger.info("Manual scrape triggered from UI")
+    job_id = submit_job(executor_io, run_scrape)
+    flash(f"🕵️ Scraping started in the background (job {job_id}).", "info")
+    return redirect(url_for('index', job=job_id))
 
 
 @app.route('/scrape_custom', methods=['POST'])
@@ -101,22 +277,22 @@ def scrape_custom():
         flash(f"🕵️ Starting scan of {url}... This might take a moment.", "info")
         
         # Call the scraper
-        articles = scraper.scrape_custom_source(url, max_articles=5)
+        articles = get_scraper().scrape_custom_source(url, max_articles=5)
         
         if articles:
             # Save to database
             count = db_manager.insert_articles_bulk(articles)
+            db_manager.invalidate_stats()
             flash(f"✅ Found and saved {count} articles from {url}!", "success")
             
             # --- THIS IS THE KEY CHANGE ---
             # We fetch the stats and main list again, BUT we also pass 'scraped_articles'
             stats = db_manager.get_sentiment_statistics()
-            recent_articles = db_manager.get_articles(limit=0)
             
             return render_template('index.html', 
                                  stats=stats, 
-                                 articles=recent_articles,
-                                 scraped_articles=articles) # <--- Sending the new data to the UI
+                                 scraped_articles=articles, # <--- Sending the new data to the UI
+                                 **get_article_page())
         else:
             flash(f"⚠️ Could not find readable articles on {url}.", "warning")
             return redirect(url_for('index'))
@@ -126,87 +302,104 @@ def scrape_custom():
         flash(f"❌ Error scraping URL: {str(e)}", "danger")
         return redirect(url_for('index'))
 
-@app.route('/analyze', methods=['POST'])
-def analyze():
-    """Trigger sentiment analysis on unanalyzed articles"""
+def run_analysis():
+    """Analyze all unanalyzed articles (runs in the background)"""
     try:
-        # 1. Get all articles (or you could filter for just unanalyzed ones)
-        articles = db_manager.get_articles(limit=0)
-        
-        if not articles:
-            flash("⚠️ No articles found in database to analyze.", "warning")
-            return redirect(url_for('index'))
-
-        # 2. Preprocess
-        df = pd.DataFrame(articles)
+        # 1. Stream only the articles that haven't been analyzed yet
+        cursor = db_manager.iter_articles_without_sentiment(
+            batch_size=100, projection={'url': 1, 'content': 1, '_id': 0})
+        analyzer = get_analyzer()
         
-        # Only process if we have content
-        if 'content' not in df.columns:
-            flash("⚠️ Articles found but they have no content to analyze.", "warning")
-            return redirect(url_for('index'))
-
-        logger.info(f"Analyzing {len(df)} articles...")
-        
-        # 3. Analyze and Update Database
+        # 2. Analyze in HF batches of 32 as documents arrive, flushing updates
+        # every 500 so memory stays bounded by the batch sizes, not the collection
+        seen = 0
         count = 0
-        for _, row in df.iterrows():
-            # Skip if already analyzed (optional optimization)
-            # if 'sentiment_label' in row and pd.notna(row['sentiment_label']): continue
-
-            # Text to analyze: use processed content if available, else raw
-            text_to_analyze = row.get('content', '') # CHANGED to use raw content for better accuracy
-            
-            # Perform Analysis
-            result = analyzer.analyze_article({'content': text_to_analyze})
+        updates = []
+        for batch in batched(cursor, 32):
+            seen += len(batch)
+            # Use raw content for better accuracy; skip articles without any
+            batch = [article for article in batch if article.get('content')]
+            if not batch:
+                continue
             
-            # Update Database
-            update_data = {
-                'sentiment_label': result['sentiment_label'],
-                'sentiment_score': result['sentiment_score'],
-                'model_used': result['model_used']
-            }
+            texts = [article['content'][:Config.MAX_ARTICLE_LENGTH] for article in batch]
+            results = analyzer.analyze_batch(texts, batch_size=32)
             
-            success = db_manager.update_article_sentiment(row['url'], update_data)
-            if success:
-                count += 1
+            updates.extend(
+                (article['url'], {
+                    'sentiment_label': result['sentiment_label'],
+                    'sentiment_score': result['sentiment_score'],
+                    'model_used': result['model_used']
+                })
+                for article, result in zip(batch, results)
+            )
+            if len(updates) >= 500:
+                count += db_manager.update_article_sentiments_bulk(updates)
+                updates = []
+        
+        if not seen:
+            return "warning", "⚠️ No unanalyzed articles found in database."
+        
+        # 3. Flush the remaining updates
+        count += db_manager.update_article_sentiments_bulk(updates)
+        db_manager.invalidate_stats()
         
         # --- NEW: Retrain Logistic Regression with the freshly analyzed data ---
         if count > 0:
             logger.info("Analysis complete. Retraining Logistic Regression model...")
-            all_labeled_data = db_manager.get_articles({'sentiment_label': {'$exists': True}}, limit=0)
-            train_msg = analyzer.train_on_db(all_labeled_data)
-            flash(f"✅ Analysis complete! Updated {count} articles. ({train_msg})", "success")
-        else:
-            flash(f"✅ Analysis complete! Updated {count} articles.", "success")
+            train_msg = analyzer.train_on_db(db_manager.iter_training_rows())
+            return "success", f"✅ Analysis complete! Updated {count} articles. ({train_msg})"
+        return "success", f"✅ Analysis complete! Updated {count} articles."
         # -----------------------------------------------------------------------
 
     except Exception as e:
         logger.error(f"Analysis error: {e}")
-        flash(f"❌ Error during analysis: {str(e)}", "danger")
-        
-    return redirect(url_for('index'))
+        return "danger", f"❌ Error during analysis: {str(e)}"
+
+
+@app.route('/analyze', methods=['POST'])
+def analyze():
+    """Trigger sentiment analysis on unanalyzed articles"""
+    job_id = submit_job(executor_cpu, run_analysis)
+    flash(f"🧠 Analysis started in the background (job {job_id}).", "info")
+    return redirect(url_for('index', job=job_id))
 
 
 @app.route('/visualize')
 def dashboard():
-    """Generate plots and show the dashboard"""
+    """Generate plots (only when the data changed) and show the dashboard"""
     try:
-        articles = db_manager.get_articles(limit=0)
-        
-        if not articles:
+        stats = db_manager.get_sentiment_statistics()
+        if not stats.get('total_articles'):
             flash("⚠️ No data available to visualize.", "warning")
             return redirect(url_for('index'))
-
-        # Check if we have sentiment data
-        if 'sentiment_label' not in articles[0]:
-             flash("⚠️ Data exists but hasn't been analyzed yet. Run 'Analysis' first.", "warning")
-             # We still render the page, but images might be empty/broken
         
-        # Generate Visualizations (Saves them to static/images)
-        # This ensures the dashboard always shows fresh data
-        visualizer.generate_all_visualizations(articles)
+        # Plot files are named after a hash of the aggregate statistics, so an
+        # unchanged dataset reuses the existing images (and the new name busts
+        # the browser cache whenever the data does change)
+        data_hash = stats_fingerprint(stats, db_manager.get_source_statistics())
+        
+        visualizer = get_visualizer()
+        images = visualizer.output_filenames(data_hash)
+        
+        # Checked via the completion marker: plots skipped for lack of labels never
+        # write a file, so testing each image would regenerate on every hit
+        if not visualizer.has_outputs(data_hash):
+            articles = db_manager.get_articles(limit=0, projection=VISUALIZE_PROJECTION)
+            
+            if not articles:
+                flash("⚠️ No data available to visualize.", "warning")
+                return redirect(url_for('index'))
+
+            # Check if we have sentiment data
+            if 'sentiment_label' not in articles[0]:
+                 flash("⚠️ Data exists but hasn't been analyzed yet. Run 'Analysis' first.", "warning")
+                 # We still render the page, but images might be empty/broken
+            
+            # Generate Visualizations (Saves them to static/images)
+            visualizer.generate_all_visualizations(articles, data_hash=data_hash)
         
-        return render_template('dashboard.html')
+        return render_template('dashboard.html', images=images)
         
     except Exception as e:
         logger.error(f"Visualization error: {e}")
@@ -225,6 +418,7 @@ def test_prediction():
     
     try:
         # Get predictions from both models
+        analyzer = get_analyzer()
         hf_label, hf_score = analyzer.predict_huggingface(text)
         lr_label, lr_score = analyzer.predict_logistic(text)
         
@@ -236,13 +430,11 @@ def test_prediction():
         
         # Re-render index with the result
         stats = db_manager.get_sentiment_statistics()
-        # MODIFIED: Ensure we get all articles for the list
-        recent_articles = db_manager.get_articles(limit=0)
         
         return render_template('index.html', 
                              prediction_result=result,
                              stats=stats,
-                             articles=recent_articles)
+                             **get_article_page())
                              
     except Exception as e:
         logger.error(f"Prediction error: {e}")
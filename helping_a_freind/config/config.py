@@ -26,6 +26,14 @@ class Config:
     DATABASE_NAME = 'news_sentiment_db'
     COLLECTION_NAME = 'articles'
     
+    # Connection pool shared by every NewsDatabase instance
+    MONGODB_MAX_POOL_SIZE = 50
+    MONGODB_MIN_POOL_SIZE = 5
+    MONGODB_SERVER_SELECTION_TIMEOUT_MS = 2000
+    
+    # Documents per insert_many / bulk_write command (keeps each batch well under 16MB)
+    MONGODB_INSERT_BATCH_SIZE = 500
+    
     # ---------------------------------------------------------
     # SCRAPING SETTINGS
     # ---------------------------------------------------------
@@ -38,6 +46,10 @@ class Config:
     # Headers to mimic a real browser request
     USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
     REQUEST_TIMEOUT = 10
+    MAX_CONCURRENT_REQUESTS = 5  # Per host, for the async scraper
+    PARSE_WORKERS = 4  # Threads parsing fetched article pages
+    HTML_PARSER = 'lxml'  # C parser for BeautifulSoup; 'html.parser' works without lxml
+    MAX_PAGE_BYTES = 2_000_000  # Downloads are cut off after this many (decoded) bytes
     MAX_ARTICLES_PER_SOURCE = 50
     
     # ---------------------------------------------------------
@@ -49,11 +61,36 @@ class Config:
     # HuggingFace Model for Sentiment Analysis
     HUGGINGFACE_MODEL = "distilbert-base-uncased-finetuned-sst-2-english"
     
+    # Apply int8 dynamic quantization to the model for faster, smaller CPU inference
+    HF_QUANTIZE = os.getenv('HF_QUANTIZE', '1') == '1'
+    
+    # Run the CPU model in bfloat16 instead (recent CPUs with AVX512-BF16 / AMX);
+    # takes precedence over HF_QUANTIZE. On a CUDA GPU the model always runs in FP16.
+    HF_CPU_BF16 = os.getenv('HF_CPU_BF16', '0') == '1'
+    
+    # ---------------------------------------------------------
+    # WEB APP SETTINGS
+    # ---------------------------------------------------------
+    ARTICLES_PER_PAGE = 50
+    
     # ---------------------------------------------------------
     # VISUALIZATION SETTINGS
     # ---------------------------------------------------------
     FIGURE_SIZE = (10, 6)
-    DPI = 100
+    PLOT_DPI = 80  # Single-chart plots (800x480 px at FIGURE_SIZE)
+    
+    # zlib level for PNG output: 1 is several times faster to encode than the default
+    PNG_COMPRESS_LEVEL = 1
+    
+    # Above this many articles the timeline plots hourly means instead of every article
+    TIMELINE_MAX_POINTS = 5000
+    
+    # How timeline HTML loads plotly.js: 'cdn', or 'directory' for offline use
+    # (writes one shared plotly.min.js next to the HTML files)
+    PLOTLY_JS = os.getenv('PLOTLY_JS', 'cdn')
+    
+    # Worker processes rendering plots in parallel (1 renders them serially)
+    VISUALIZATION_WORKERS = int(os.getenv('VISUALIZATION_WORKERS', min(5, os.cpu_count() or 1)))
     
     # ---------------------------------------------------------
     # LOGGING SETTINGS
@@ -61,15 +98,34 @@ class Config:
     LOG_LEVEL = logging.INFO
     LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     
+    # Set once setup_directories() has run so later calls are free
+    _dirs_ready = False
+    
+    @staticmethod
+    def _mkdir_swallow(path):
+        """Create a directory with a single mkdir, ignoring 'already exists'"""
+        try:
+            os.mkdir(path)
+        except FileExistsError:
+            pass
+        except FileNotFoundError:
+            # Parent is missing too - fall back to the recursive version
+            os.makedirs(path, exist_ok=True)
+    
     @classmethod
     def setup_directories(cls):
         """Create necessary directories if they don't exist"""
+        if cls._dirs_ready:
+            return
+        
         # Create image output directory
-        os.makedirs(cls.OUTPUT_DIR, exist_ok=True)
+        cls._mkdir_swallow(cls.OUTPUT_DIR)
         
         # Create models directory
-        os.makedirs(cls.MODELS_DIR, exist_ok=True)
+        cls._mkdir_swallow(cls.MODELS_DIR)
         
         # Create css directory (ensures structure exists for Flask)
         css_dir = os.path.join(cls.BASE_DIR, 'static', 'css')
-        os.makedirs(css_dir, exist_ok=True)
\ No newline at end of file
+        cls._mkdir_swallow(css_dir)
+        
+        cls._dirs_ready = True
\ No newline at end of file
@@ -3,6 +3,7 @@
 import logging
 import argparse
 import pandas as pd
+import numpy as np
 from config.config import Config
 from src.scraper import NewsScraper
 from src.database import NewsDatabase  # Changed from DatabaseManager
@@ -21,6 +22,21 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+# Column dtypes applied when building DataFrames from MongoDB documents, so
+# pandas doesn't have to infer them (and 'source' is stored as int codes)
+ARTICLE_SCHEMA = {
+    'url': 'string',
+    'title': 'string',
+    'content': 'string',
+    'source': 'category'
+}
+
+
+def articles_to_dataframe(articles) -> pd.DataFrame:
+    """Build a DataFrame from article documents using ARTICLE_SCHEMA dtypes"""
+    df = pd.DataFrame(articles)
+    return df.astype({col: dtype for col, dtype in ARTICLE_SCHEMA.items() if col in df.columns})
+
 
 def scrape_news(db_manager: NewsDatabase, max_articles: int = 50):
     """Scrape news articles and store in database"""
@@ -57,7 +73,7 @@ def preprocess_and_analyze(db_manager: NewsDatabase, analyzer: SentimentAnalyzer
         return None, None
     
     # Convert to DataFrame
-    df = pd.DataFrame(articles)
+    df = articles_to_dataframe(articles)
     
     # Preprocess text
     preprocessor = TextPreprocessor()
@@ -71,30 +87,40 @@ def preprocess_and_analyze(db_manager: NewsDatabase, analyzer: SentimentAnalyzer
     
     # Update database with sentiment results
     print("\n📝 Updating database with sentiment results...")
-    for idx, row in df.iterrows():
-        sentiment_data = {
-            'sentiment_label': int(row['sentiment_label']),
-            'cleaned_title': row.get('cleaned_title', ''),
-            'cleaned_content': row.get('cleaned_content', ''),
-            'combined_text': row.get('combined_text', '')
-        }
-        # --- THIS LINE HAS BEEN CORRECTED ---
-        # The database function updates using 'url', not '_id'
-        db_manager.update_article_sentiment(row['url'], sentiment_data)
+    # Build every update up front and send them as batched bulk_writes.
+    # Pull each column out as a NumPy array once instead of boxing rows.
+    update_columns = ['url', 'sentiment_label', 'cleaned_title', 'cleaned_content', 'combined_text']
+    update_df = df.reindex(columns=update_columns, fill_value='')
+    urls = update_df['url'].to_numpy()
+    labels = update_df['sentiment_label'].to_numpy(dtype=np.int8)
+    titles = update_df['cleaned_title'].to_numpy()
+    contents = update_df['cleaned_content'].to_numpy()
+    combined_texts = update_df['combined_text'].to_numpy()
+    
+    updates = [
+        (url, {
+            'sentiment_label': int(label),
+            'cleaned_title': title,
+            'cleaned_content': content,
+            'combined_text': combined
+        })
+        for url, label, title, content, combined in zip(urls, labels, titles, contents, combined_texts)
+    ]
+    db_manager.update_article_sentiments_bulk(updates)
     
     print("✅ Database updated with sentiment analysis")
     
     return df, metrics
 
 
-def visualize_results(db_manager: NewsDatabase, df, metrics):
+def visualize_results(db_manager: NewsDatabase, df, metrics, parallel: bool = False):
     """Create visualizations from analyzed articles"""
     print("\n" + "=" * 80)
     print("STEP 3: GENERATING VISUALIZATIONS")
     print("=" * 80)
     
     visualizer = SentimentVisualizer()
-    visualizer.generate_all_visualizations(df, metrics)
+    visualizer.generate_all_visualizations(df, parallel=parallel)
 
 
 # --- THIS FUNCTION HAS BEEN CORRECTED ---
@@ -215,7 +241,7 @@ def run_full_pipeline(args):
                 # --- THIS LINE HAS BEEN CORRECTED ---
                 articles = db_manager.get_articles(limit=0)
                 if articles:
-                    df = pd.DataFrame(articles)
+                    df = articles_to_dataframe(articles)
                     if 'sentiment_label' in df.columns:
                         print("📊 Using existing sentiment data for visualization")
                         # Create dummy metrics for visualization
@@ -230,7 +256,7 @@ def run_full_pipeline(args):
                 else:
                     print("⚠️  No articles in database for visualization")
             else:
-                visualize_results(db_manager, df, metrics)
+                visualize_results(db_manager, df, metrics, parallel=args.parallel_plots)
         
         # Step 4: Test predictions
         if args.test:
@@ -284,6 +310,8 @@ Examples:
     # Options
     parser.add_argument('--max-articles', type=int, default=50,
                         help='Maximum articles to scrape per source (default: 50)')
+    parser.add_argument('--parallel-plots', action='store_true',
+                        help='Render visualizations in worker processes (worthwhile only for large datasets)')
     
     args = parser.parse_args()
     
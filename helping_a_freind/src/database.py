@@ -1,8 +1,12 @@
 # src/database.py
 
-from pymongo import MongoClient, ASCENDING, DESCENDING
-from pymongo.errors import DuplicateKeyError
-from typing import List, Dict, Optional
+from pymongo import MongoClient, ASCENDING, DESCENDING, IndexModel, UpdateOne, WriteConcern
+from pymongo.errors import DuplicateKeyError, BulkWriteError
+from typing import List, Dict, Optional, Iterator, Tuple, Callable
+from concurrent.futures import ThreadPoolExecutor
+import threading
+import atexit
+import time
 import logging
 from config.config import Config
 
@@ -13,10 +17,47 @@ logger = logging.getLogger(__name__)
 class NewsDatabase:
     """Manages MongoDB operations for news articles"""
     
+    # Seconds before cached statistics are refreshed in the background
+    STATS_TTL = 30
+    
+    # One MongoClient (and its connection pool) shared by every instance
+    _client = None
+    _client_lock = threading.Lock()
+    
+    @classmethod
+    def _get_client(cls) -> MongoClient:
+        """Return the shared client, creating it on first use"""
+        with cls._client_lock:
+            if cls._client is None:
+                cls._client = MongoClient(
+                    Config.MONGODB_URI,
+                    maxPoolSize=Config.MONGODB_MAX_POOL_SIZE,
+                    minPoolSize=Config.MONGODB_MIN_POOL_SIZE,
+                    serverSelectionTimeoutMS=Config.MONGODB_SERVER_SELECTION_TIMEOUT_MS
+                )
+            return cls._client
+    
+    @classmethod
+    def close_client(cls) -> None:
+        """Close the shared client for every instance (also registered with atexit)"""
+        with cls._client_lock:
+            if cls._client is not None:
+                cls._client.close()
+                cls._client = None
+    
     def __init__(self):
         """Initialize MongoDB connection"""
+        # Stale-while-revalidate cache for the aggregation statistics:
+        # name -> (value, last_updated). Stale entries are served immediately
+        # while a single background worker recomputes them.
+        self._stats_cache = {}
+        self._stats_generation = 0
+        self._stats_refreshing = set()
+        self._stats_lock = threading.Lock()
+        self._stats_executor = ThreadPoolExecutor(max_workers=1)
+        
         try:
-            self.client = MongoClient(Config.MONGODB_URI)
+            self.client = self._get_client()
             self.db = self.client[Config.DATABASE_NAME]
             self.collection = self.db[Config.COLLECTION_NAME]
             
@@ -29,16 +70,35 @@ class NewsDatabase:
             logger.error(f"Error connecting to MongoDB: {e}")
             raise
     
+    # Single-field indexes now covered by a compound index prefix
+    REDUNDANT_INDEXES = ('source_1', 'sentiment_label_1')
+    
     def _create_indexes(self):
         """Create database indexes"""
         try:
-            # Unique index on URL to prevent duplicates
-            self.collection.create_index([('url', ASCENDING)], unique=True)
+            indexes = [
+                # Unique index on URL to prevent duplicates
+                IndexModel([('url', ASCENDING)], unique=True),
+                
+                # Newest-first listing on the index page
+                IndexModel([('scraped_at', DESCENDING)]),
+                IndexModel([('sentiment_score', DESCENDING)]),
+                
+                # Unanalyzed articles ({'sentiment_label': {'$exists': False}}) and
+                # label filters, newest first. Missing fields are indexed as null;
+                # a partial index isn't possible since partialFilterExpression
+                # rejects $exists: false.
+                IndexModel([('sentiment_label', ASCENDING), ('scraped_at', DESCENDING)]),
+                
+                # Per-source queries and source statistics
+                IndexModel([('source', ASCENDING), ('sentiment_score', DESCENDING)]),
+            ]
+            self.collection.create_indexes(indexes)
             
-            # Indexes for common queries
-            self.collection.create_index([('source', ASCENDING)])
-            self.collection.create_index([('scraped_at', DESCENDING)])
-            self.collection.create_index([('sentiment_score', DESCENDING)])
+            existing = self.collection.index_information()
+            for name in self.REDUNDANT_INDEXES:
+                if name in existing:
+                    self.collection.drop_index(name)
             
             logger.info("Database indexes created successfully")
             
@@ -60,13 +120,39 @@ class NewsDatabase:
             logger.error(f"Error inserting article: {e}")
             return False
     
-    def insert_articles_bulk(self, articles: List[Dict]) -> int:
-        """Insert multiple articles into the database"""
+    def insert_articles_bulk(self, articles: List[Dict], fast_insert: bool = False) -> int:
+        """Insert articles in chunked batched commands, skipping duplicates
+        
+        fast_insert uses an unacknowledged (w=0) write concern, so the
+        returned count is the number of articles sent rather than stored
+        """
+        if not articles:
+            return 0
+        
+        collection = self.collection
+        if fast_insert:
+            collection = collection.with_options(write_concern=WriteConcern(w=0))
+        
+        batch_size = Config.MONGODB_INSERT_BATCH_SIZE
         inserted_count = 0
         
-        for article in articles:
-            if self.insert_article(article):
-                inserted_count += 1
+        for start in range(0, len(articles), batch_size):
+            batch = articles[start:start + batch_size]
+            try:
+                # ordered=False keeps going past duplicate URLs (unique index on 'url')
+                result = collection.insert_many(batch, ordered=False)
+                inserted_count += len(result.inserted_ids)
+                
+            except BulkWriteError as e:
+                write_errors = e.details.get('writeErrors', [])
+                duplicates = sum(1 for err in write_errors if err.get('code') == 11000)
+                if len(write_errors) > duplicates:
+                    logger.error(f"Failed to insert {len(write_errors) - duplicates} articles")
+                logger.debug(f"Skipped {duplicates} articles that already exist")
+                inserted_count += e.details.get('nInserted', len(batch) - len(write_errors))
+                
+            except Exception as e:
+                logger.error(f"Error inserting articles: {e}")
         
         logger.info(f"Inserted {inserted_count} new articles out of {len(articles)}")
         return inserted_count
@@ -84,13 +170,51 @@ class NewsDatabase:
             logger.error(f"Error updating sentiment for {url}: {e}")
             return False
     
-    def get_articles(self, filter_query: Optional[Dict] = None, limit: int = 100) -> List[Dict]:
-        """Retrieve articles from the database"""
+    def _bulk_write_updates(self, operations: List[UpdateOne]) -> int:
+        """Apply a batch of UpdateOne operations in a single round-trip"""
+        if not operations:
+            return 0
+        
+        try:
+            result = self.collection.bulk_write(operations, ordered=False)
+            logger.info(f"Bulk updated {result.modified_count} articles out of {len(operations)}")
+            return result.modified_count
+            
+        except BulkWriteError as e:
+            logger.error(f"Bulk update partially failed: {len(e.details.get('writeErrors', []))} errors")
+            return e.details.get('nModified', 0)
+            
+        except Exception as e:
+            logger.error(f"Error in bulk sentiment update: {e}")
+            return 0
+    
+    def update_article_sentiments_bulk(self, updates: List[Tuple[str, Dict]]) -> int:
+        """Set sentiment fields for many (url, data) pairs, batch_size ops per bulk_write"""
+        batch_size = Config.MONGODB_INSERT_BATCH_SIZE
+        updated_count = 0
+        
+        for start in range(0, len(updates), batch_size):
+            # UpdateOne only ever touches the first match, never multi=True
+            operations = [
+                UpdateOne({'url': url}, {'$set': sentiment_data})
+                for url, sentiment_data in updates[start:start + batch_size]
+            ]
+            updated_count += self._bulk_write_updates(operations)
+        
+        return updated_count
+    
+    def get_articles(self, filter_query: Optional[Dict] = None, limit: int = 100,
+                     projection: Optional[Dict] = None, skip: int = 0,
+                     sort: Optional[List[Tuple[str, int]]] = None) -> List[Dict]:
+        """Retrieve articles from the database (optionally projected, sorted and paginated)"""
         try:
             if filter_query is None:
                 filter_query = {}
             
-            articles = list(self.collection.find(filter_query).limit(limit))
+            cursor = self.collection.find(filter_query, projection)
+            if sort:
+                cursor = cursor.sort(sort)
+            articles = list(cursor.skip(skip).limit(limit).batch_size(500))
             logger.info(f"Retrieved {len(articles)} articles")
             return articles
             
@@ -98,18 +222,112 @@ class NewsDatabase:
             logger.error(f"Error retrieving articles: {e}")
             return []
     
+    def iter_articles(self, filter_query: Optional[Dict] = None, projection: Optional[Dict] = None,
+                      batch_size: int = 500) -> Iterator[Dict]:
+        """Stream articles from a cursor instead of materializing a list"""
+        if filter_query is None:
+            filter_query = {}
+        return self.collection.find(filter_query, projection).batch_size(batch_size)
+    
+    def iter_training_rows(self, batch_size: int = 1000) -> Iterator[Tuple[str, str]]:
+        """Stream (processed_content, sentiment_label) pairs for model training"""
+        try:
+            cursor = self.collection.find(
+                {
+                    'sentiment_label': {'$in': ['positive', 'negative']},
+                    'processed_content': {'$exists': True}
+                },
+                {'processed_content': 1, 'sentiment_label': 1, '_id': 0}
+            ).batch_size(batch_size)
+            
+            for doc in cursor:
+                yield doc['processed_content'], doc['sentiment_label']
+                
+        except Exception as e:
+            logger.error(f"Error streaming training data: {e}")
+    
     def get_articles_by_source(self, source: str) -> List[Dict]:
         """Get articles from a specific source"""
         return self.get_articles({'source': source})
     
-    def get_articles_without_sentiment(self) -> List[Dict]:
+    # Fields sentiment analysis needs from an unanalyzed article
+    UNANALYZED_PROJECTION = {'url': 1, 'processed_content': 1, '_id': 0}
+    
+    def iter_articles_without_sentiment(self, batch_size: int = 100,
+                                        projection: Optional[Dict] = None) -> Iterator[Dict]:
+        """Stream unanalyzed articles so memory stays bounded by the batch size"""
+        if projection is None:
+            projection = self.UNANALYZED_PROJECTION
+        try:
+            cursor = self.collection.find(
+                {'sentiment_label': {'$exists': False}}, projection
+            ).batch_size(batch_size)
+            yield from cursor
+            
+        except Exception as e:
+            logger.error(f"Error streaming unanalyzed articles: {e}")
+    
+    def get_articles_without_sentiment(self, projection: Optional[Dict] = None) -> List[Dict]:
         """Get articles that haven't been analyzed for sentiment"""
-        return self.get_articles({'sentiment_label': {'$exists': False}})
+        if projection is None:
+            projection = self.UNANALYZED_PROJECTION
+        return self.get_articles({'sentiment_label': {'$exists': False}}, projection=projection)
+    
+    def _store_stats(self, name: str, value: Dict, generation: int) -> None:
+        """Cache a statistics result unless the cache was invalidated meanwhile"""
+        with self._stats_lock:
+            if value and generation == self._stats_generation:
+                self._stats_cache[name] = (value, time.monotonic())
+    
+    def _refresh_stats(self, name: str, compute: Callable[[], Dict], generation: int) -> None:
+        """Recompute one statistics entry (runs on the background executor)"""
+        try:
+            self._store_stats(name, compute(), generation)
+        finally:
+            with self._stats_lock:
+                self._stats_refreshing.discard(name)
+    
+    def _cached_stats(self, name: str, compute: Callable[[], Dict]) -> Dict:
+        """Serve cached statistics, refreshing them in the background once stale"""
+        with self._stats_lock:
+            entry = self._stats_cache.get(name)
+            generation = self._stats_generation
+            
+            if entry is not None:
+                value, last_updated = entry
+                if (time.monotonic() - last_updated > self.STATS_TTL
+                        and name not in self._stats_refreshing):
+                    self._stats_refreshing.add(name)
+                    self._stats_executor.submit(self._refresh_stats, name, compute, generation)
+                return value
+        
+        # Nothing cached yet - compute synchronously
+        value = compute()
+        self._store_stats(name, value, generation)
+        return value
+    
+    def invalidate_stats(self) -> None:
+        """Drop cached statistics (call after articles are inserted or analyzed)"""
+        with self._stats_lock:
+            self._stats_cache.clear()
+            self._stats_generation += 1
     
     def get_sentiment_statistics(self) -> Dict:
-        """Get aggregate statistics on article sentiments"""
+        """Get aggregate statistics on article sentiments (cached)"""
+        return self._cached_stats('sentiment', self._compute_sentiment_statistics)
+    
+    def get_source_statistics(self) -> Dict:
+        """Get statistics grouped by news source (cached)"""
+        return self._cached_stats('source', self._compute_source_statistics)
+    
+    def _compute_sentiment_statistics(self) -> Dict:
+        """Run the sentiment aggregation pipeline"""
         try:
+            # $match/$sort first so the scan walks the sentiment_label index
+            # instead of the whole collection; unanalyzed articles are skipped
             pipeline = [
+                {'$match': {'sentiment_label': {'$exists': True}}},
+                {'$sort': {'sentiment_label': 1}},
                 {
                     '$group': {
                         '_id': '$sentiment_label',
@@ -119,10 +337,11 @@ class NewsDatabase:
                 }
             ]
             
-            results = list(self.collection.aggregate(pipeline))
+            results = list(self.collection.aggregate(pipeline, allowDiskUse=False))
             
             stats = {
-                'total_articles': self.collection.count_documents({}),
+                # Collection metadata, not a full count scan
+                'total_articles': self.collection.estimated_document_count(),
                 'by_sentiment': results
             }
             
@@ -132,10 +351,15 @@ class NewsDatabase:
             logger.error(f"Error calculating statistics: {e}")
             return {}
     
-    def get_source_statistics(self) -> Dict:
-        """Get statistics grouped by news source"""
+    def _compute_source_statistics(self) -> Dict:
+        """Run the source aggregation pipeline"""
         try:
+            # The leading $sort lets the planner walk the {source, sentiment_score}
+            # index in order instead of sorting in memory; documents are still
+            # fetched for the $exists match
             pipeline = [
+                {'$match': {'source': {'$exists': True}}},
+                {'$sort': {'source': 1}},
                 {
                     '$group': {
                         '_id': '$source',
@@ -146,7 +370,7 @@ class NewsDatabase:
                 {'$sort': {'count': -1}}
             ]
             
-            results = list(self.collection.aggregate(pipeline))
+            results = list(self.collection.aggregate(pipeline, allowDiskUse=False))
             return {'by_source': results}
             
         except Exception as e:
@@ -157,6 +381,7 @@ class NewsDatabase:
         """Delete all articles from the database"""
         try:
             result = self.collection.delete_many({})
+            self.invalidate_stats()
             logger.info(f"Deleted {result.deleted_count} articles")
             return result.deleted_count
             
@@ -165,6 +390,11 @@ class NewsDatabase:
             return 0
     
     def close(self):
-        """Close the database connection"""
-        self.client.close()
-        logger.info("Database connection closed")
\ No newline at end of file
+        """Release this instance's resources"""
+        self._stats_executor.shutdown(wait=False)
+        # The client is shared with every other live instance, so it stays open
+        # until close_client() or interpreter exit
+        logger.info("Database handle closed")
+
+
+atexit.register(NewsDatabase.close_client)
\ No newline at end of file
@@ -1,13 +1,15 @@
 # src/preprocessor.py
 
 import re
+import functools
+from collections import Counter
 import nltk
 from nltk.corpus import stopwords
-from nltk.tokenize import word_tokenize
 from nltk.stem import WordNetLemmatizer
 from textblob import TextBlob
 import logging
-from typing import List, Dict, Set
+from typing import List, Dict, Set, Iterable, Iterator
+import pandas as pd
 from config.config import Config
 
 logging.basicConfig(level=Config.LOG_LEVEL, format=Config.LOG_FORMAT)
@@ -26,6 +28,17 @@ except Exception as e:
 class TextPreprocessor:
     """Handles text cleaning and preprocessing for sentiment analysis"""
     
+    # Patterns compiled once per process instead of re-parsed on every call
+    _HTML_RE = re.compile(r'<.*?>')
+    _URL_RE = re.compile(r'https?\S+|www\S+', re.MULTILINE)
+    _EMAIL_RE = re.compile(r'\S+@\S+')
+    _WS_RE = re.compile(r'\s+')
+    _NON_ALPHA_RE = re.compile(r'[^a-zA-Z\s]')
+    _TOKEN_RE = re.compile(r"[a-zA-Z]+")
+    
+    # HTML tags, URLs and email addresses in one alternation (one walk over the text)
+    _JUNK_RE = re.compile('|'.join(p.pattern for p in (_HTML_RE, _URL_RE, _EMAIL_RE)), re.MULTILINE)
+    
     def __init__(self):
         """Initialize preprocessor with required resources"""
         # Load standard English stopwords
@@ -38,23 +51,28 @@ class TextPreprocessor:
         self.stop_words = base_stopwords - self.negations
         
         self.lemmatizer = WordNetLemmatizer()
+        # News text repeats the same words constantly, so memoize WordNet lookups
+        self._lemmatize = functools.lru_cache(maxsize=50000)(self.lemmatizer.lemmatize)
+        
+        # Compiled once: URLs, HTML tags and HTML entities in a single pass
+        self._combined = re.compile(r'(https?://\S+|<[^>]+>|&\w+;)')
+        
+        # Column-wide equivalents for pandas .str methods (one C-level pass per article)
+        self._non_word_re = re.compile(r'[^\w\s]|[\d_]')
+        self._stopwords_re = re.compile(
+            r'\b(?:' + '|'.join(map(re.escape, sorted(self.stop_words, key=len, reverse=True))) + r')\b'
+        )
         
     def clean_text(self, text: str) -> str:
         """Clean and normalize text"""
         if not text:
             return ""
         
-        # 1. Remove HTML tags
-        text = re.sub(r'<.*?>', '', text)
-        
-        # 2. Remove URLs
-        text = re.sub(r'http\S+|www\S+|https\S+', '', text, flags=re.MULTILINE)
+        # 1. Remove HTML tags, URLs and Email addresses
+        text = self._JUNK_RE.sub('', text)
         
-        # 3. Remove Email addresses
-        text = re.sub(r'\S+@\S+', '', text)
-        
-        # 4. Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
+        # 2. Remove extra whitespace
+        text = self._WS_RE.sub(' ', text).strip()
         
         # IMPROVEMENT: We DO NOT lowercase everything or remove punctuation here anymore.
         # Modern AI models (like HuggingFace) need casing and punctuation to detect 
@@ -62,6 +80,10 @@ class TextPreprocessor:
         
         return text
     
+    def _tokenize(self, text: str) -> List[str]:
+        """Split text into alphabetic word tokens (bag-of-words only, no Punkt)"""
+        return self._TOKEN_RE.findall(text)
+    
     def preprocess_for_model(self, text: str) -> str:
         """
         Special preprocessing just for the AI Model.
@@ -78,21 +100,16 @@ class TextPreprocessor:
         text = text.lower()
         
         # Remove special characters only for this specific statistical view
-        text = re.sub(r'[^a-zA-Z\s]', '', text)
-        
-        words = word_tokenize(text)
+        text = self._NON_ALPHA_RE.sub('', text)
         
-        # Remove stopwords (but keep negations!)
-        filtered_words = [word for word in words if word not in self.stop_words]
+        words = self._tokenize(text)
         
-        # Lemmatize (convert "running" -> "run")
-        lemmatized_words = [self.lemmatizer.lemmatize(word) for word in filtered_words]
-        
-        return ' '.join(lemmatized_words)
+        # Remove stopwords (but keep negations!) and lemmatize ("running" -> "run")
+        return ' '.join(self._lemmatize(word) for word in words if word not in self.stop_words)
     
     def get_basic_statistics(self, text: str) -> Dict:
         """Extract basic text statistics"""
-        words = word_tokenize(text)
+        words = self._tokenize(text)
         sentences = nltk.sent_tokenize(text)
         
         return {
@@ -102,20 +119,32 @@ class TextPreprocessor:
             'avg_sentence_length': len(words) / len(sentences) if sentences else 0
         }
     
-    def extract_keywords(self, text: str, top_n: int = 10) -> List[str]:
-        """Extract most frequent keywords from text"""
-        # Use the heavy preprocessing for keyword extraction
-        processed_text = self.preprocess_for_analysis(text)
-        words = word_tokenize(processed_text)
-        
+    def extract_keywords(self, tokens: List[str], top_n: int = 10) -> List[str]:
+        """Extract most frequent keywords from tokens of preprocess_for_analysis output"""
         # Count word frequencies
-        word_freq = {}
-        for word in words:
-            if len(word) > 3:
-                word_freq[word] = word_freq.get(word, 0) + 1
-        
-        sorted_words = sorted(word_freq.items(), key=lambda x: x[1], reverse=True)
-        return [word for word, freq in sorted_words[:top_n]]
+        counts = Counter(word for word in tokens if len(word) > 3)
+        return [word for word, freq in counts.most_common(top_n)]
+    
+    def preprocess_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Add cleaned_title, cleaned_content and combined_text columns to an article DataFrame"""
+        for source_col, target_col in (('title', 'cleaned_title'), ('content', 'cleaned_content')):
+            if source_col in df.columns:
+                # Vectorized .str chain: lowercase, drop URLs/HTML, punctuation/digits
+                # and stopwords (negations are kept), then collapse whitespace
+                df[target_col] = (
+                    df[source_col].fillna('').astype(str)
+                    .str.lower()
+                    .str.replace(self._combined, ' ', regex=True)
+                    .str.replace(self._non_word_re, '', regex=True)
+                    .str.replace(self._stopwords_re, '', regex=True)
+                    .str.replace(r'\s+', ' ', regex=True)
+                    .str.strip()
+                )
+            else:
+                df[target_col] = ''
+        
+        df['combined_text'] = df['cleaned_title'] + ' ' + df['cleaned_content']
+        return df
     
     def validate_article(self, article: Dict) -> bool:
         """Validate if article meets minimum requirements"""
@@ -129,10 +158,8 @@ class TextPreprocessor:
         
         return True
     
-    def preprocess_articles(self, articles: List[Dict]) -> List[Dict]:
-        """Preprocess a list of articles"""
-        processed_articles = []
-        
+    def preprocess_iter(self, articles: Iterable[Dict]) -> Iterator[Dict]:
+        """Lazily preprocess articles one at a time, skipping invalid ones"""
         for article in articles:
             if not self.validate_article(article):
                 continue
@@ -144,12 +171,19 @@ class TextPreprocessor:
             # 2. clean_tokens: Heavily stripped (for Word Clouds/Stats)
             
             article['processed_content'] = self.preprocess_for_model(original_content)
-            article['clean_tokens'] = self.preprocess_for_analysis(original_content)
+            
+            # Heavy preprocessing runs once; keywords reuse the same tokens
+            tokens = self._tokenize(self.preprocess_for_analysis(original_content))
+            article['clean_tokens'] = ' '.join(tokens)
             
             article['statistics'] = self.get_basic_statistics(original_content)
-            article['keywords'] = self.extract_keywords(original_content)
+            article['keywords'] = self.extract_keywords(tokens)
             
-            processed_articles.append(article)
+            yield article
+    
+    def preprocess_articles(self, articles: List[Dict]) -> List[Dict]:
+        """Preprocess a list of articles"""
+        processed_articles = list(self.preprocess_iter(articles))
         
         logger.info(f"Preprocessed {len(processed_articles)} articles")
         return processed_articles
\ No newline at end of file
@@ -1,174 +1,130 @@
 # src/scraper.py
 
-import requests
+import re
+import aiohttp
+import asyncio
 from bs4 import BeautifulSoup
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
-import time
 import logging
-from typing import List, Dict
+from typing import List, Dict, Tuple, Optional, Callable
+from urllib.parse import urljoin
 from config.config import Config
 
 logging.basicConfig(level=Config.LOG_LEVEL, format=Config.LOG_FORMAT)
 logger = logging.getLogger(__name__)
 
+# Links that never point at an article
+_SKIP_RE = re.compile(r'#|javascript:|mailto:')
+
 
 class NewsScraper:
     """Web scraper for extracting news articles from various sources"""
     
     def __init__(self):
-        self.headers = {'User-Agent': Config.USER_AGENT}
-        self.session = requests.Session()
+        # Compressed transfer cuts wire bytes; aiohttp decompresses transparently
+        self.headers = {'User-Agent': Config.USER_AGENT, 'Accept-Encoding': 'gzip, deflate'}
+        # Article pages are parsed here so the event loop keeps other downloads moving
+        self._parse_executor = ThreadPoolExecutor(max_workers=Config.PARSE_WORKERS)
         
+    # Display names stored in the 'source' field, keyed by Config.NEWS_SOURCES key
+    SOURCE_NAMES = {'bbc': 'BBC', 'reuters': 'Reuters'}
+    
+    # Union selectors for article body paragraphs, keyed like SOURCE_NAMES
+    CONTENT_SELECTORS = {
+        'bbc': 'article p, main p, div[data-component="text-block"] p',
+        'reuters': 'article p, main p, div[class*="article"] p',
+    }
+    
     def scrape_bbc(self, max_articles: int = Config.MAX_ARTICLES_PER_SOURCE) -> List[Dict]:
         """Scrape articles from BBC News"""
-        articles = []
-        try:
-            logger.info("Scraping BBC News...")
-            response = self.session.get(
-                Config.NEWS_SOURCES['bbc'], 
-                headers=self.headers, 
-                timeout=Config.REQUEST_TIMEOUT
-            )
-            response.raise_for_status()
-            
-            # IMPORTANT: Using html.parser NOT lxml!
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # Find article links using multiple selectors
-            article_links = []
-            selectors = [
-                'a[class*="promo"]',
-                'h2 a',
-                'h3 a',
-                'article a'
-            ]
-            
-            for selector in selectors:
-                links = soup.select(selector)
-                article_links.extend(links)
-                if len(article_links) >= max_articles:
-                    break
-            
-            # Remove duplicates
-            seen_urls = set()
-            unique_links = []
-            for link in article_links:
-                url = link.get('href', '')
-                if url and url not in seen_urls:
-                    seen_urls.add(url)
-                    unique_links.append(link)
+        return asyncio.run(self.scrape_all_sources_async(sources=('bbc',), max_articles=max_articles))
+    
+    def _find_bbc_links(self, soup: BeautifulSoup, max_articles: int) -> List[Tuple[str, str]]:
+        """Find (url, title) pairs of candidate articles on the BBC front page"""
+        # Find article links using multiple selectors
+        article_links = []
+        selectors = [
+            'a[class*="promo"]',
+            'h2 a',
+            'h3 a',
+            'article a'
+        ]
+        
+        for selector in selectors:
+            links = soup.select(selector)
+            article_links.extend(links)
+            if len(article_links) >= max_articles:
+                break
+        
+        # Remove duplicates (dict keeps the first link per href, in order)
+        unique_links = {}
+        for link in article_links:
+            url = link.get('href')
+            if url:
+                unique_links.setdefault(url, link)
+        
+        article_links = list(unique_links.items())[:max_articles]
+        logger.info(f"Found {len(article_links)} potential article links")
+        
+        candidates = []
+        for url, link in article_links:
+            # Make URL absolute
+            if url.startswith('/'):
+                url = urljoin('https://www.bbc.com/', url)
+            elif not url.startswith('http'):
+                continue
             
-            article_links = unique_links[:max_articles]
-            logger.info(f"Found {len(article_links)} potential article links")
+            # Skip non-article URLs
+            if _SKIP_RE.search(url):
+                continue
             
-            for link in article_links:
-                try:
-                    url = link.get('href')
-                    if not url:
-                        continue
-                        
-                    # Make URL absolute
-                    if url.startswith('/'):
-                        url = 'https://www.bbc.com' + url
-                    elif not url.startswith('http'):
-                        continue
-                    
-                    # Skip non-article URLs
-                    if any(skip in url for skip in ['#', 'javascript:', 'mailto:']):
-                        continue
-                    
-                    title = link.get_text(strip=True)
-                    if not title or len(title) < 10:
-                        continue
-                    
-                    logger.info(f"Scraping: {title[:50]}...")
-                    article_data = self._extract_article_content(url, 'bbc')
-                    
-                    if article_data and article_data.get('content'):
-                        article_data.update({
-                            'title': title,
-                            'url': url,
-                            'source': 'BBC',
-                            'scraped_at': datetime.now()
-                        })
-                        articles.append(article_data)
-                        logger.info(f"✅ Scraped: {title[:50]}...")
-                        time.sleep(2)  # Be respectful
-                        
-                except Exception as e:
-                    logger.warning(f"Error scraping BBC article: {e}")
-                    continue
-                        
-        except Exception as e:
-            logger.error(f"Error scraping BBC News: {e}")
+            title = link.get_text(strip=True)
+            if not title or len(title) < 10:
+                continue
             
-        logger.info(f"Successfully scraped {len(articles)} articles from BBC")
-        return articles
+            candidates.append((url, title))
+        
+        return candidates
     
     def scrape_reuters(self, max_articles: int = Config.MAX_ARTICLES_PER_SOURCE) -> List[Dict]:
         """Scrape articles from Reuters (may be blocked)"""
-        articles = []
-        try:
-            logger.info("Scraping Reuters...")
-            response = self.session.get(
-                Config.NEWS_SOURCES['reuters'], 
-                headers=self.headers, 
-                timeout=Config.REQUEST_TIMEOUT
-            )
-            response.raise_for_status()
-            
-            # IMPORTANT: Using html.parser NOT lxml!
-            soup = BeautifulSoup(response.content, 'html.parser')
-            article_containers = soup.find_all('article', limit=max_articles * 2)
+        return asyncio.run(self.scrape_all_sources_async(sources=('reuters',), max_articles=max_articles))
+    
+    def _find_source_links(self, html: bytes, source: str, max_articles: int) -> List[Tuple[str, str]]:
+        """Parse a configured source's front page and find its candidate article links"""
+        soup = BeautifulSoup(html, Config.HTML_PARSER)
+        find_links = self._find_bbc_links if source == 'bbc' else self._find_reuters_links
+        return find_links(soup, max_articles)
+    
+    def _find_reuters_links(self, soup: BeautifulSoup, max_articles: int) -> List[Tuple[str, str]]:
+        """Find (url, title) pairs of candidate articles on the Reuters front page"""
+        article_containers = soup.find_all('article', limit=max_articles * 2)
+        logger.info(f"Found {len(article_containers)} potential articles")
+        
+        candidates = []
+        for container in article_containers:
+            link = container.find('a')
+            if not link:
+                continue
+                
+            url = link.get('href')
+            if not url:
+                continue
             
-            logger.info(f"Found {len(article_containers)} potential articles")
+            # Make URL absolute
+            if url.startswith('/'):
+                url = urljoin('https://www.reuters.com/', url)
+            elif not url.startswith('http'):
+                continue
             
-            for container in article_containers:
-                if len(articles) >= max_articles:
-                    break
-                        
-                try:
-                    link = container.find('a')
-                    if not link:
-                        continue
-                        
-                    url = link.get('href')
-                    if not url:
-                        continue
-                    
-                    # Make URL absolute
-                    if url.startswith('/'):
-                        url = 'https.www.reuters.com' + url
-                    elif not url.startswith('http'):
-                        continue
-                    
-                    title = link.get_text(strip=True)
-                    if not title or len(title) < 10:
-                        continue
-                    
-                    logger.info(f"Scraping: {title[:50]}...")
-                    article_data = self._extract_article_content(url, 'reuters')
-                    
-                    if article_data and article_data.get('content'):
-                        article_data.update({
-                            'title': title,
-                            'url': url,
-                            'source': 'Reuters',
-                            'scraped_at': datetime.now()
-                        })
-                        articles.append(article_data)
-                        logger.info(f"✅ Scraped: {title[:50]}...")
-                        time.sleep(2)
-                        
-                except Exception as e:
-                    logger.warning(f"Error scraping Reuters article: {e}")
-                    continue
-                        
-        except Exception as e:
-            logger.error(f"Error scraping Reuters: {e}")
+            title = link.get_text(strip=True)
+            if not title or len(title) < 10:
+                continue
             
-        logger.info(f"Successfully scraped {len(articles)} articles from Reuters")
-        return articles
+            candidates.append((url, title))
+        
+        return candidates
 
     def scrape_custom_source(self, start_url: str, max_articles: int = 5) -> List[Dict]:
         """
@@ -184,137 +140,219 @@ class NewsScraper:
         
         try:
             logger.info(f"Custom scraping started for: {start_url}")
-            response = self.session.get(start_url, headers=self.headers, timeout=Config.REQUEST_TIMEOUT)
-            soup = BeautifulSoup(response.content, 'html.parser')
-            
-            # 1. Find potential article links
-            # We look for links that are longer than 25 chars (usually articles) 
-            # and belong to the same domain.
-            found_links = set()
-            for a in soup.find_all('a', href=True):
-                href = a['href']
-                
-                # Fix relative URLs
-                if href.startswith('/'):
-                    href = f"{start_url.rstrip('/')}{href}"
-                
-                # Filter: Must be http/https, contain domain (basic check), and be long enough
-                if href.startswith('http') and domain in href and len(href) > 25:
-                    found_links.add(href)
-                    
-            # Limit the number of links to scrape
-            target_links = list(found_links)[:max_articles]
-            logger.info(f"Found {len(target_links)} potential articles on {domain}")
-            
-            # 2. Visit each link and extract content
-            for link in target_links:
-                try:
-                    logger.info(f"Scraping generic: {link}")
-                    art_response = self.session.get(link, headers=self.headers, timeout=10)
-                    art_soup = BeautifulSoup(art_response.content, 'html.parser')
-                    
-                    # Generic Title Extraction (h1 usually)
-                    title_tag = art_soup.find('h1')
-                    title = title_tag.get_text(strip=True) if title_tag else art_soup.title.text
-                    
-                    # Generic Content Extraction (All paragraphs)
-                    paragraphs = art_soup.find_all('p')
-                    # Filter out short "menu" paragraphs
-                    content = ' '.join([p.text.strip() for p in paragraphs if len(p.text.strip()) > 50])
-                    
-                    if len(content) > 200: # Only save if we found substantial text
-                        articles.append({
-                            'title': title,
-                            'url': link,
-                            'content': content,
-                            'source': domain, # Use domain as source name
-                            'scraped_at': datetime.now()
-                        })
-                        time.sleep(1) # Be polite
-                        
-                except Exception as e:
-                    logger.warning(f"Failed to parse generic article {link}: {e}")
-                    continue
-                    
+            articles = asyncio.run(self._scrape_custom_async(start_url, domain, max_articles))
         except Exception as e:
             logger.error(f"Error connecting to custom source {start_url}: {e}")
             
         return articles
     
-    def _extract_article_content(self, url: str, source: str) -> Dict:
-        """Extract article content from URL"""
-        try:
-            response = self.session.get(
-                url, 
-                headers=self.headers, 
-                timeout=Config.REQUEST_TIMEOUT
-            )
-            response.raise_for_status()
-            
-            # IMPORTANT: Using html.parser NOT lxml!
-            soup = BeautifulSoup(response.content, 'html.parser')
+    def _find_custom_links(self, html: bytes, start_url: str, domain: str) -> List[str]:
+        """Find links on a custom source's page that look like articles"""
+        soup = BeautifulSoup(html, Config.HTML_PARSER)
+        
+        # We look for links that are longer than 25 chars (usually articles) 
+        # and belong to the same domain.
+        found_links = set()
+        for a in soup.find_all('a', href=True):
+            href = a['href']
             
-            # Extract paragraphs
-            paragraphs = []
+            # Fix relative URLs
+            if href.startswith('/'):
+                href = f"{start_url.rstrip('/')}{href}"
             
-            if source == 'bbc':
-                selectors = ['article p', 'main p', 'div[data-component="text-block"] p', 'p']
-                for selector in selectors:
-                    paragraphs = soup.select(selector)
-                    if len(paragraphs) > 3:
-                        break
-                        
-            elif source == 'reuters':
-                selectors = ['article p', 'main p', 'div[class*="article"] p', 'p']
-                for selector in selectors:
-                    paragraphs = soup.select(selector)
-                    if len(paragraphs) > 3:
-                        break
-            else:
-                paragraphs = soup.find_all('p')
+            # Filter: Must be http/https, contain domain (basic check), and be long enough
+            if href.startswith('http') and domain in href and len(href) > 25:
+                found_links.add(href)
+        
+        return list(found_links)
+    
+    def _parse_custom_article(self, html: bytes) -> Optional[Tuple[str, str]]:
+        """Extract (title, content) from a generic article page"""
+        art_soup = BeautifulSoup(html, Config.HTML_PARSER)
+        
+        # Generic Title Extraction (h1 usually)
+        title_tag = art_soup.find('h1')
+        title = title_tag.get_text(strip=True) if title_tag else art_soup.title.text
+        
+        # Generic Content Extraction (All paragraphs)
+        paragraphs = art_soup.find_all('p')
+        # Filter out short "menu" paragraphs
+        texts = (p.get_text().strip() for p in paragraphs)
+        content = ' '.join(t for t in texts if len(t) > 50)
+        
+        if len(content) > 200: # Only save if we found substantial text
+            return title, content
+        return None
+    
+    async def _scrape_custom_async(self, start_url: str, domain: str, max_articles: int) -> List[Dict]:
+        """Find article links on a custom source and fetch them concurrently"""
+        timeout = aiohttp.ClientTimeout(total=Config.REQUEST_TIMEOUT)
+        async with aiohttp.ClientSession(headers=self.headers, timeout=timeout) as session:
+            semaphore = asyncio.Semaphore(Config.MAX_CONCURRENT_REQUESTS)
             
-            # Extract text
-            content = ' '.join([p.get_text(strip=True) for p in paragraphs if p.get_text(strip=True)])
+            front_page = await self._fetch(session, semaphore, start_url)
+            if front_page is None:
+                return []
             
-            # Filter out short content
-            if len(content) < 100:
-                logger.warning(f"Content too short ({len(content)} chars)")
-                return None
+            # 1. Find potential article links
+            loop = asyncio.get_running_loop()
+            found_links = await loop.run_in_executor(
+                self._parse_executor, self._find_custom_links, front_page, start_url, domain)
             
-            # Extract publish date
-            pub_date = None
-            time_tag = soup.find('time')
-            if time_tag:
-                pub_date = time_tag.get('datetime')
+            # Limit the number of links to scrape
+            target_links = found_links[:max_articles]
+            logger.info(f"Found {len(target_links)} potential articles on {domain}")
             
-            return {
+            # 2. Visit each link and extract content
+            parsed = await asyncio.gather(
+                *(self._fetch_and_parse(session, semaphore, link, self._parse_custom_article)
+                  for link in target_links)
+            )
+        
+        articles = []
+        for link, result in zip(target_links, parsed):
+            if result is None:
+                continue
+            title, content = result
+            articles.append({
+                'title': title,
+                'url': link,
                 'content': content,
-                'published_date': pub_date,
-                'word_count': len(content.split())
-            }
-            
-        except Exception as e:
-            logger.warning(f"Error extracting content from {url}: {e}")
+                'source': domain, # Use domain as source name
+                'scraped_at': datetime.now()
+            })
+        return articles
+    
+    def _parse_article_content(self, html: bytes, source: str) -> Optional[Dict]:
+        """Extract content and publish date from a fetched article page"""
+        soup = BeautifulSoup(html, Config.HTML_PARSER)
+        
+        # Extract paragraphs: one traversal for the article-body selectors,
+        # falling back to every <p> when they find too little
+        paragraphs = []
+        selector = self.CONTENT_SELECTORS.get(source)
+        if selector:
+            paragraphs = soup.select(selector)
+        if len(paragraphs) <= 3:
+            paragraphs = soup.find_all('p')
+        
+        # Extract text
+        # get_text walks the paragraph's subtree, so call it once per paragraph
+        texts = (p.get_text(strip=True) for p in paragraphs)
+        content = ' '.join(t for t in texts if t)
+        
+        # Filter out short content
+        if len(content) < 100:
+            logger.warning(f"Content too short ({len(content)} chars)")
             return None
+        
+        # Extract publish date
+        pub_date = None
+        time_tag = soup.find('time')
+        if time_tag:
+            pub_date = time_tag.get('datetime')
+        
+        return {
+            'content': content,
+            'published_date': pub_date,
+            'word_count': len(content.split())
+        }
     
-    def scrape_all_sources(self) -> List[Dict]:
-        """Scrape articles from all configured sources"""
-        all_articles = []
+    async def _fetch(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                     url: str) -> Optional[bytes]:
+        """Fetch one page, returning None on failure"""
+        async with semaphore:
+            try:
+                async with session.get(url) as response:
+                    response.raise_for_status()
+                    # Stop reading past MAX_PAGE_BYTES; truncated HTML still parses
+                    body = bytearray()
+                    async for chunk in response.content.iter_chunked(64 * 1024):
+                        body += chunk
+                        if len(body) >= Config.MAX_PAGE_BYTES:
+                            break
+                    return bytes(body[:Config.MAX_PAGE_BYTES])
+            except Exception as e:
+                logger.warning(f"Error fetching {url}: {e}")
+                return None
+    
+    async def _fetch_and_parse(self, session: aiohttp.ClientSession, semaphore: asyncio.Semaphore,
+                               url: str, parse: Callable, *args):
+        """Fetch a page and parse it on the parse thread pool, returning None on failure"""
+        page = await self._fetch(session, semaphore, url)
+        if page is None:
+            return None
         
-        # Try BBC
+        loop = asyncio.get_running_loop()
         try:
-            bbc_articles = self.scrape_bbc()
-            all_articles.extend(bbc_articles)
+            return await loop.run_in_executor(self._parse_executor, parse, page, *args)
         except Exception as e:
-            logger.error(f"Failed to scrape BBC: {e}")
+            logger.warning(f"Error parsing {url}: {e}")
+            return None
+    
+    async def _scrape_source_async(self, session: aiohttp.ClientSession, source: str,
+                                   max_articles: int = Config.MAX_ARTICLES_PER_SOURCE) -> List[Dict]:
+        """Scrape one configured source, fetching its article pages concurrently"""
+        logger.info(f"Scraping {self.SOURCE_NAMES[source]}...")
+        # One semaphore per source, i.e. per host, to stay polite
+        semaphore = asyncio.Semaphore(Config.MAX_CONCURRENT_REQUESTS)
+        
+        front_page = await self._fetch(session, semaphore, Config.NEWS_SOURCES[source])
+        if front_page is None:
+            return []
+        
+        # Parsed on the parse pool too, so the other source's downloads keep going
+        loop = asyncio.get_running_loop()
+        links = await loop.run_in_executor(
+            self._parse_executor, self._find_source_links, front_page, source, max_articles)
         
-        # Try Reuters (will likely fail with 401)
-        # --- MODIFIED: Commented out to prevent 401 error ---
-        # try:
-        #     reuters_articles = self.scrape_reuters()
-        #     all_articles.extend(reuters_articles)
-        # except Exception as e:
-        #     logger.error(f"Failed to scrape Reuters: {e}")
+        parsed = await asyncio.gather(
+            *(self._fetch_and_parse(session, semaphore, url, self._parse_article_content, source)
+              for url, _ in links)
+        )
+        
+        articles = []
+        for (url, title), article_data in zip(links, parsed):
+            if len(articles) >= max_articles:
+                break
+            
+            if article_data and article_data.get('content'):
+                article_data.update({
+                    'title': title,
+                    'url': url,
+                    'source': self.SOURCE_NAMES[source],
+                    'scraped_at': datetime.now()
+                })
+                articles.append(article_data)
+                logger.info(f"✅ Scraped: {title[:50]}...")
+        
+        logger.info(f"Successfully scraped {len(articles)} articles from {self.SOURCE_NAMES[source]}")
+        return articles
+    
+    async def scrape_all_sources_async(self, sources: Tuple[str, ...] = ('bbc',),
+                                       max_articles: int = Config.MAX_ARTICLES_PER_SOURCE) -> List[Dict]:
+        """Scrape several sources concurrently"""
+        timeout = aiohttp.ClientTimeout(total=Config.REQUEST_TIMEOUT)
+        async with aiohttp.ClientSession(headers=self.headers, timeout=timeout) as session:
+            results = await asyncio.gather(
+                *(self._scrape_source_async(session, source, max_articles) for source in sources),
+                return_exceptions=True
+            )
+        
+        all_articles = []
+        for source, result in zip(sources, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to scrape {self.SOURCE_NAMES[source]}: {result}")
+                continue
+            all_articles.extend(result)
+        return all_articles
+    
+    def scrape_all_sources(self) -> List[Dict]:
+        """Scrape articles from all configured sources"""
+        # Reuters (will likely fail with 401)
+        # --- MODIFIED: Left out of the sources to prevent 401 error ---
+        # Pass sources=('bbc', 'reuters') to try it anyway.
+        all_articles = asyncio.run(self.scrape_all_sources_async(sources=('bbc',)))
         
         logger.info(f"Total articles scraped: {len(all_articles)}")
         return all_articles
\ No newline at end of file
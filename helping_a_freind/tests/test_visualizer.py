@@ -0,0 +1,71 @@
+# tests/test_visualizer.py
+
+from datetime import datetime, timedelta
+
+import pytest
+
+pd = pytest.importorskip('pandas')
+pytest.importorskip('plotly')
+pytest.importorskip('matplotlib')
+pytest.importorskip('seaborn')
+
+from config.config import Config
+from src.visualizer import SentimentVisualizer
+
+
+@pytest.fixture
+def visualizer(tmp_path, monkeypatch):
+    monkeypatch.setattr(Config, 'OUTPUT_DIR', str(tmp_path))
+    return SentimentVisualizer()
+
+
+def labeled_articles():
+    start = datetime(2024, 1, 1)
+    labels = ['positive', 'negative', 'neutral', 'positive', 'negative', 'positive']
+    return pd.DataFrame({
+        'title': [f'Article {i}' for i in range(len(labels))],
+        'source': ['BBC', 'Reuters'] * 3,
+        'sentiment_label': labels,
+        'sentiment_score': [0.9, 0.8, 0.5, 0.7, 0.95, 0.6],
+        'scraped_at': [start + timedelta(hours=i) for i in range(len(labels))]
+    })
+
+
+def test_summary_report_html_renders(visualizer, tmp_path):
+    path = tmp_path / 'summary_report.html'
+    visualizer.create_summary_report(labeled_articles(), save_path=str(path))
+    
+    page = path.read_text(encoding='utf-8')
+    assert 'Summary Statistics' in page
+    assert 'Total Articles Analyzed: 6' in page
+    assert 'Mean: ' in page
+
+
+def test_generate_all_skips_plots_for_unanalyzed_articles(visualizer, tmp_path):
+    articles = labeled_articles().drop(columns=['sentiment_label', 'sentiment_score'])
+    visualizer.generate_all_visualizations(articles, data_hash='abc123')
+    
+    assert visualizer.has_outputs('abc123')
+    assert not (tmp_path / 'sentiment_timeline_abc123.html').exists()
+
+
+def test_stale_cleanup_keeps_previous_and_unfinished_sets(visualizer, tmp_path):
+    articles = labeled_articles()
+    for data_hash in ('old', 'previous', 'current'):
+        visualizer.generate_all_visualizations(articles, data_hash=data_hash)
+    # A set another request is still writing has files but no marker yet
+    (tmp_path / 'sentiment_scores_inflight.png').write_bytes(b'')
+    visualizer._remove_stale_outputs('current')
+    
+    assert not (tmp_path / 'sentiment_scores_old.png').exists()
+    assert not visualizer.has_outputs('old')
+    assert (tmp_path / 'sentiment_scores_previous.png').exists()
+    assert (tmp_path / 'sentiment_scores_current.png').exists()
+    assert (tmp_path / 'sentiment_scores_inflight.png').exists()
+
+
+def test_integer_labels_map_to_sentiments(visualizer):
+    articles = labeled_articles().assign(sentiment_label=[1, 0, 'neutral', 1, 0, 'positive'])
+    _, stats = visualizer._prepare(articles)
+    
+    assert stats['sentiment_counts'].to_dict() == {'positive': 3, 'negative': 2, 'neutral': 1}
@@ -5,12 +5,18 @@ News Sentiment Analysis System
 A comprehensive system for scraping, analyzing, and visualizing news article sentiments
 """
 
-from .scraper import NewsScraper
+import importlib
+
+# Submodules are imported lazily on attribute access, so importing one light
+# module (e.g. src.database) doesn't drag in torch/transformers/matplotlib.
 # FIXED: Changed 'DatabaseManager' to 'NewsDatabase' to match your database.py file
-from .database import NewsDatabase  
-from .preprocessor import TextPreprocessor
-from .sentiment import SentimentAnalyzer
-from .visualizer import SentimentVisualizer
+_LAZY_EXPORTS = {
+    'NewsScraper': '.scraper',
+    'NewsDatabase': '.database',
+    'TextPreprocessor': '.preprocessor',
+    'SentimentAnalyzer': '.sentiment',
+    'SentimentVisualizer': '.visualizer',
+}
 
 __version__ = '1.0.0'
 __author__ = 'rohank'
@@ -21,4 +27,11 @@ __all__ = [
     'TextPreprocessor',
     'SentimentAnalyzer',
     'SentimentVisualizer'
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name):
+    if name in _LAZY_EXPORTS:
+        module = importlib.import_module(_LAZY_EXPORTS[name], __name__)
+        return getattr(module, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -5,76 +5,277 @@ matplotlib.use('Agg')  # Fixes the main thread error!
 import matplotlib.pyplot as plt
 import seaborn as sns
 import plotly.graph_objects as go
-import plotly.express as px
+from plotly.subplots import make_subplots
 # from wordcloud import WordCloud  <-- Commented out
 import pandas as pd
 import numpy as np
-from typing import List, Dict
+from typing import List, Dict, Optional, Tuple, Union
 import logging
 from config.config import Config
 import os
+import io
+import tempfile
+import html
+import glob
+import contextlib
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor
 
 logging.basicConfig(level=Config.LOG_LEVEL, format=Config.LOG_FORMAT)
 logger = logging.getLogger(__name__)
 
-# Set style
-plt.style.use('seaborn-v0_8')
-sns.set_palette("husl")
+# Page wrapped around the Plotly summary figure; the statistics block is plain text
+SUMMARY_REPORT_TEMPLATE = """<!DOCTYPE html>
+<html>
+<head>
+<meta charset="utf-8">
+<title>News Sentiment Analysis - Summary Report</title>
+</head>
+<body style="font-family: sans-serif; margin: 0 1em;">
+<h2>News Sentiment Analysis - Summary Report</h2>
+{figure}
+<pre>{summary}</pre>
+</body>
+</html>"""
+
+# Plot style is applied on first draw, not at import, so importing this module stays cheap
+_STYLE_INIT = False
+
+
+def _ensure_style() -> None:
+    """Apply the seaborn style and palette once per process"""
+    global _STYLE_INIT
+    if not _STYLE_INIT:
+        plt.style.use('seaborn-v0_8')
+        sns.set_palette("husl")
+        _warm_fonts()
+        _STYLE_INIT = True
+
+
+def _warm_fonts() -> None:
+    """Render a throwaway figure so font lookup and Agg setup happen before the first real plot"""
+    # Called from _ensure_style, i.e. only in processes that draw with matplotlib
+    fig, ax = plt.subplots()
+    ax.text(0, 0, 'warm')
+    fig.canvas.draw()
+    plt.close(fig)
 
 
 class SentimentVisualizer:
     """Create visualizations for sentiment analysis results"""
     
+    # Output file written by generate_all_visualizations for each plot
+    OUTPUT_FILES = {
+        'distribution': 'sentiment_distribution.png',
+        'by_source': 'sentiment_by_source.png',
+        'scores': 'sentiment_scores.png',
+        'timeline': 'sentiment_timeline.html',
+        'summary': 'summary_report.html'
+    }
+    
+    SENTIMENT_COLORS = {'positive': '#2ecc71', 'negative': '#e74c3c', 'neutral': '#95a5a6'}
+    # int8 codes instead of Python strings; also fixes the label order (and so the colors)
+    SENTIMENT_DTYPE = pd.CategoricalDtype(['positive', 'negative', 'neutral'])
+    # main.py's Logistic Regression pipeline stores integer labels
+    INTEGER_LABELS = {1: 'positive', 0: 'negative'}
+    
+    # Internal renderer for each output, all called as method(df, stats, save_path)
+    PLOT_METHODS = {
+        'distribution': '_plot_distribution_df',
+        'by_source': '_plot_by_source_df',
+        'scores': '_plot_scores_df',
+        'timeline': '_plot_timeline_df',
+        'summary': '_summary_report_html_df'
+    }
+    
     def __init__(self):
         """Initialize visualizer"""
         self.output_dir = Config.OUTPUT_DIR
         os.makedirs(self.output_dir, exist_ok=True)
+        # DataFrame + aggregates for the last articles object passed to a plot method
+        self._cache = {}
+        self._fig = None  # Reused by every single-chart plot, created on first use
+        # The app shares one visualizer across request threads; the figure and cache
+        # above are only touched while holding this
+        self._lock = threading.RLock()
+    
+    @staticmethod
+    def _savefig(fig, save_path: str, dpi: int) -> None:
+        """Save a figure as PNG with fast, unoptimized zlib compression"""
+        # Encode in memory, then write the file in one call and swap it into place,
+        # so readers never see a half-written image and slow disks see one open/write
+        # The buffer has no extension to infer from, so the format is always explicit
+        buffer = io.BytesIO()
+        fig.savefig(buffer, format='png', dpi=dpi,
+                    pil_kwargs={'optimize': False, 'compress_level': Config.PNG_COMPRESS_LEVEL})
+        SentimentVisualizer._replace_file(save_path, buffer.getbuffer())
+    
+    @staticmethod
+    def _replace_file(save_path: str, data) -> None:
+        """Write data to a unique temp file beside save_path, then swap it into place"""
+        # mkstemp, not a fixed '.tmp' name, so concurrent writers of the same output
+        # can't interleave into one file; a failed write doesn't leave it behind
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(save_path) or '.', suffix='.tmp')
+        try:
+            try:
+                data = memoryview(data)
+                while data:
+                    data = data[os.write(fd, data):]
+            finally:
+                os.close(fd)
+            os.chmod(tmp_path, 0o644)  # mkstemp creates 0600; static files must be readable
+            os.replace(tmp_path, save_path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    
+    @staticmethod
+    def _draw_histogram(ax, histogram: Tuple[np.ndarray, np.ndarray]) -> None:
+        """Draw precomputed np.histogram (counts, edges) as bars"""
+        counts, edges = histogram
+        ax.bar(edges[:-1], counts, width=np.diff(edges), align='edge',
+               color='#3498db', edgecolor='black', alpha=0.7)
+    
+    def _single_axes(self):
+        """Clear the shared single-chart figure and return (fig, ax) on it"""
+        # Figure creation (style + font setup) costs more than clearing one,
+        # so the single-chart plots all redraw the same figure
+        if self._fig is None:
+            self._fig = plt.figure(figsize=Config.FIGURE_SIZE)
+        self._fig.clear()
+        return self._fig, self._fig.add_subplot(111)
+    
+    def close(self) -> None:
+        """Release the shared figure"""
+        if self._fig is not None:
+            plt.close(self._fig)
+            self._fig = None
+    
+    @staticmethod
+    def _to_frame(articles: Union[List[Dict], pd.DataFrame]) -> pd.DataFrame:
+        """Accept either a list of article dicts or an already-built DataFrame"""
+        if isinstance(articles, pd.DataFrame):
+            return articles
+        return pd.DataFrame(articles)
     
-    def plot_sentiment_distribution(self, articles: List[Dict], 
-                                   save_path: str = None) -> None:
+    @classmethod
+    def _with_categorical_labels(cls, df: pd.DataFrame) -> pd.DataFrame:
+        """Copy of df with sentiment_label cast to SENTIMENT_DTYPE (unknown labels become NaN)"""
+        if 'sentiment_label' not in df.columns or df['sentiment_label'].dtype == cls.SENTIMENT_DTYPE:
+            return df
+        
+        raw = df['sentiment_label']
+        labels = raw.replace(cls.INTEGER_LABELS).astype(cls.SENTIMENT_DTYPE)
+        unknown = int((labels.isna() & raw.notna()).sum())
+        if unknown:
+            logger.warning(f"{unknown} sentiment labels are not one of "
+                           f"{list(cls.SENTIMENT_DTYPE.categories)} and are plotted as neutral")
+        return df.assign(sentiment_label=labels)
+    
+    def _precompute(self, df: pd.DataFrame) -> Dict:
+        """Aggregates shared by several plots, computed once per dataset"""
+        if 'sentiment_label' in df.columns:
+            labels = df['sentiment_label'].fillna('neutral')
+        else:
+            labels = pd.Series('neutral', index=df.index)
+        
+        # One vectorized pass into a contiguous float32 array (missing scores count as 0.5)
+        if 'sentiment_score' in df.columns:
+            scores = df['sentiment_score'].to_numpy(dtype=np.float32, na_value=0.5)
+        else:
+            scores = np.full(len(df), 0.5, dtype=np.float32)
+        
+        # Categorical value_counts lists every category; keep only labels that occur
+        sentiment_counts = labels.value_counts()
+        
+        stats = {
+            'sentiment_counts': sentiment_counts[sentiment_counts > 0],
+            'avg_score': df['sentiment_score'].mean() if 'sentiment_score' in df.columns else 0.0,
+            'scores': scores,
+            # (counts, bin edges) binned in C once, drawn by both score histograms
+            'score_histogram': np.histogram(scores, bins=30),
+            'crosstab_source': None
+        }
+        if 'source' in df.columns and 'sentiment_label' in df.columns:
+            # Same table as pd.crosstab(source, label) without crosstab's pivot_table overhead
+            stats['crosstab_source'] = (df.groupby(['source', 'sentiment_label'], observed=True)
+                                          .size()
+                                          .unstack(fill_value=0))
+        return stats
+    
+    def _prepare(self, articles: Union[List[Dict], pd.DataFrame]) -> Tuple[pd.DataFrame, Dict]:
+        """DataFrame and aggregates for articles, reused while the same object is passed in"""
+        if self._cache and self._cache['articles'] is articles:
+            return self._cache['df'], self._cache['stats']
+        
+        df = self._with_categorical_labels(self._to_frame(articles))
+        stats = self._precompute(df)
+        # Holding the reference keeps id(articles) from being reused by another object
+        self._cache = {'articles': articles, 'df': df, 'stats': stats}
+        return df, stats
+    
+    # Public plot methods take a list of articles or a DataFrame and share one cached
+    # DataFrame/aggregates per articles object, so e.g. create_summary_report after the
+    # individual plots doesn't recompute counts or the crosstab.
+    
+    def plot_sentiment_distribution(self, articles: Union[List[Dict], pd.DataFrame],
+                                   save_path: str = None, stats: Optional[Dict] = None) -> None:
         """Plot distribution of sentiment labels"""
-        sentiments = [article.get('sentiment_label', 'neutral') for article in articles]
-        sentiment_counts = pd.Series(sentiments).value_counts()
+        with self._lock:
+            df, cached_stats = self._prepare(articles)
+            self._plot_distribution_df(df, stats or cached_stats, save_path)
+    
+    def _plot_distribution_df(self, df: pd.DataFrame, stats: Dict, save_path: str = None) -> None:
+        """Draw the sentiment distribution bar chart from precomputed counts"""
+        if df.empty or 'sentiment_label' not in df.columns:
+            logger.warning("No sentiment labels available for distribution plot")
+            return
+        
+        _ensure_style()
+        sentiment_counts = stats['sentiment_counts']
         
-        fig, ax = plt.subplots(figsize=Config.FIGURE_SIZE)
+        fig, ax = self._single_axes()
         
-        colors = {'positive': '#2ecc71', 'negative': '#e74c3c', 'neutral': '#95a5a6'}
-        bar_colors = [colors.get(label, '#95a5a6') for label in sentiment_counts.index]
+        bar_colors = [self.SENTIMENT_COLORS.get(label, '#95a5a6') for label in sentiment_counts.index]
         
-        sentiment_counts.plot(kind='bar', ax=ax, color=bar_colors)
+        bars = sentiment_counts.plot(kind='bar', ax=ax, color=bar_colors).containers[0]
         ax.set_title('Sentiment Distribution Across Articles', fontsize=16, fontweight='bold')
         ax.set_xlabel('Sentiment', fontsize=12)
         ax.set_ylabel('Number of Articles', fontsize=12)
         ax.tick_params(axis='x', rotation=0)
         
         # Add value labels on bars
-        for i, v in enumerate(sentiment_counts.values):
-            ax.text(i, v + 0.5, str(v), ha='center', va='bottom', fontweight='bold')
+        ax.bar_label(bars, fontweight='bold', padding=3)
         
-        plt.tight_layout()
+        fig.tight_layout()
         
         if save_path is None:
             save_path = os.path.join(self.output_dir, 'sentiment_distribution.png')
         
-        plt.savefig(save_path, dpi=Config.DPI, bbox_inches='tight')
+        self._savefig(fig, save_path, Config.PLOT_DPI)
         logger.info(f"Sentiment distribution plot saved to {save_path}")
-        plt.close()
     
-    def plot_sentiment_by_source(self, articles: List[Dict], 
-                                save_path: str = None) -> None:
+    def plot_sentiment_by_source(self, articles: Union[List[Dict], pd.DataFrame],
+                                save_path: str = None, stats: Optional[Dict] = None) -> None:
         """Plot sentiment distribution by news source"""
-        df = pd.DataFrame(articles)
-        
-        if 'source' not in df.columns or 'sentiment_label' not in df.columns:
+        with self._lock:
+            df, cached_stats = self._prepare(articles)
+            self._plot_by_source_df(df, stats or cached_stats, save_path)
+    
+    def _plot_by_source_df(self, df: pd.DataFrame, stats: Dict, save_path: str = None) -> None:
+        """Draw the stacked source x sentiment bar chart"""
+        # Cross-tabulation of source x sentiment (None when the columns are missing)
+        ct = stats['crosstab_source']
+        if ct is None or ct.empty:
             logger.warning("Missing required columns for source plot")
             return
         
-        # Create cross-tabulation
-        ct = pd.crosstab(df['source'], df['sentiment_label'])
+        _ensure_style()
         
-        fig, ax = plt.subplots(figsize=Config.FIGURE_SIZE)
+        fig, ax = self._single_axes()
         ct.plot(kind='bar', stacked=True, ax=ax, 
-               color=['#2ecc71', '#e74c3c', '#95a5a6'])
+               color=[self.SENTIMENT_COLORS.get(label, '#95a5a6') for label in ct.columns])
         
         ax.set_title('Sentiment Distribution by News Source', fontsize=16, fontweight='bold')
         ax.set_xlabel('News Source', fontsize=12)
@@ -82,156 +283,332 @@ class SentimentVisualizer:
         ax.legend(title='Sentiment', bbox_to_anchor=(1.05, 1), loc='upper left')
         ax.tick_params(axis='x', rotation=45)
         
-        plt.tight_layout()
+        fig.tight_layout()
+        # Leave room for the legend outside the axes (savefig no longer crops to fit)
+        fig.subplots_adjust(right=0.78)
         
         if save_path is None:
             save_path = os.path.join(self.output_dir, 'sentiment_by_source.png')
         
-        plt.savefig(save_path, dpi=Config.DPI, bbox_inches='tight')
+        self._savefig(fig, save_path, Config.PLOT_DPI)
         logger.info(f"Sentiment by source plot saved to {save_path}")
-        plt.close()
     
-    def plot_sentiment_scores(self, articles: List[Dict], 
-                             save_path: str = None) -> None:
+    def plot_sentiment_scores(self, articles: Union[List[Dict], pd.DataFrame],
+                             save_path: str = None, stats: Optional[Dict] = None) -> None:
         """Plot distribution of sentiment scores"""
-        scores = [article.get('sentiment_score', 0.5) for article in articles]
+        with self._lock:
+            df, cached_stats = self._prepare(articles)
+            self._plot_scores_df(df, stats or cached_stats, save_path)
+    
+    def _plot_scores_df(self, df: pd.DataFrame, stats: Dict, save_path: str = None) -> None:
+        """Draw the confidence score histogram"""
+        if df.empty:
+            logger.warning("No articles available for score plot")
+            return
+        
+        _ensure_style()
+        scores = stats['scores']
+        mean_score = scores.mean() if len(scores) else 0.0
         
-        fig, ax = plt.subplots(figsize=Config.FIGURE_SIZE)
+        fig, ax = self._single_axes()
         
-        ax.hist(scores, bins=30, color='#3498db', edgecolor='black', alpha=0.7)
+        self._draw_histogram(ax, stats['score_histogram'])
         ax.set_title('Distribution of Sentiment Confidence Scores', 
                     fontsize=16, fontweight='bold')
         ax.set_xlabel('Confidence Score', fontsize=12)
         ax.set_ylabel('Frequency', fontsize=12)
-        ax.axvline(np.mean(scores), color='red', linestyle='--', 
-                  linewidth=2, label=f'Mean: {np.mean(scores):.3f}')
+        ax.axvline(mean_score, color='red', linestyle='--', 
+                  linewidth=2, label=f'Mean: {mean_score:.3f}')
         ax.legend()
         
-        plt.tight_layout()
+        fig.tight_layout()
         
         if save_path is None:
             save_path = os.path.join(self.output_dir, 'sentiment_scores.png')
         
-        plt.savefig(save_path, dpi=Config.DPI, bbox_inches='tight')
+        self._savefig(fig, save_path, Config.PLOT_DPI)
         logger.info(f"Sentiment scores plot saved to {save_path}")
-        plt.close()
     
     # REMOVED WORD CLOUD METHOD
 
-    def plot_interactive_timeline(self, articles: List[Dict]) -> None:
+    def plot_interactive_timeline(self, articles: Union[List[Dict], pd.DataFrame],
+                                  save_path: str = None) -> None:
         """Create interactive timeline of sentiment over time"""
-        df = pd.DataFrame(articles)
-        
-        if 'scraped_at' not in df.columns:
+        with self._lock:
+            df, stats = self._prepare(articles)
+            self._plot_timeline_df(df, stats, save_path=save_path)
+    
+    def _plot_timeline_df(self, df: pd.DataFrame, stats: Dict = None, save_path: str = None) -> None:
+        """Write the interactive Plotly timeline"""
+        if df.empty or 'scraped_at' not in df.columns:
             logger.warning("No timestamp data available for timeline")
             return
+        if 'sentiment_score' not in df.columns:
+            logger.warning("No sentiment scores available for timeline")
+            return
         
-        df['scraped_at'] = pd.to_datetime(df['scraped_at'])
-        df = df.sort_values('scraped_at')
-        
-        # Create interactive plot
-        fig = px.scatter(df, x='scraped_at', y='sentiment_score',
-                        color='sentiment_label',
-                        hover_data=['title', 'source'],
-                        title='Sentiment Timeline',
-                        color_discrete_map={
-                            'positive': '#2ecc71',
-                            'negative': '#e74c3c',
-                            'neutral': '#95a5a6'
-                        })
+        # assign() returns a new frame, so the shared DataFrame isn't modified
+        labels = df['sentiment_label'].fillna('neutral') if 'sentiment_label' in df.columns else 'neutral'
+        # ISO-8601 parses on pandas' C fast path; anything unparseable becomes NaT and is dropped
+        scraped_at = pd.to_datetime(df['scraped_at'], format='ISO8601', cache=True, errors='coerce')
+        df = df.assign(scraped_at=scraped_at, sentiment_label=labels)
+        df = df[scraped_at.notna().to_numpy()]
+        
+        # Past a few thousand points individual markers stop being readable (and bloat
+        # the HTML), so plot each sentiment's hourly mean instead
+        aggregated = len(df) > Config.TIMELINE_MAX_POINTS
+        if aggregated:
+            df = (df.set_index('scraped_at')
+                    .groupby([pd.Grouper(freq='1h'), 'sentiment_label'], observed=True)['sentiment_score']
+                    .agg(sentiment_score='mean', articles='size')
+                    .reset_index())
+            hover_columns = ['articles']
+            hovertemplate = '%{customdata[0]} articles<br>Mean score: %{y:.3f}'
+        else:
+            hover_columns = ['title', 'source']
+            hovertemplate = '%{customdata[0]}<br>%{customdata[1]}<br>Score: %{y:.3f}'
+        
+        # Create interactive plot: one WebGL trace per sentiment. Markers don't need x in
+        # order, so the rows aren't sorted; traces follow SENTIMENT_DTYPE's category order
+        fig = go.Figure()
+        for label, group in df.groupby('sentiment_label', sort=True, observed=True):
+            fig.add_trace(go.Scattergl(
+                x=group['scraped_at'],
+                y=group['sentiment_score'],
+                mode='markers',
+                name=label,
+                marker={'color': self.SENTIMENT_COLORS.get(label, '#95a5a6')},
+                customdata=group.reindex(columns=hover_columns).to_numpy(),
+                hovertemplate=hovertemplate
+            ))
         
         fig.update_layout(
+            title='Sentiment Timeline (hourly means)' if aggregated else 'Sentiment Timeline',
             xaxis_title='Time',
             yaxis_title='Sentiment Score',
             hovermode='closest'
         )
         
-        save_path = os.path.join(self.output_dir, 'sentiment_timeline.html')
-        fig.write_html(save_path)
+        if save_path is None:
+            save_path = os.path.join(self.output_dir, 'sentiment_timeline.html')
+        
+        # Reference plotly.js instead of embedding the ~3MB bundle in every file
+        fig.write_html(save_path, include_plotlyjs=Config.PLOTLY_JS, full_html=True,
+                       config={'responsive': True})
         logger.info(f"Interactive timeline saved to {save_path}")
     
-    def create_summary_report(self, articles: List[Dict]) -> None:
-        """Create comprehensive summary report"""
-        df = pd.DataFrame(articles)
+    def create_summary_report(self, articles: Union[List[Dict], pd.DataFrame],
+                              save_path: str = None, stats: Optional[Dict] = None) -> None:
+        """Create the summary report as an interactive HTML page"""
+        with self._lock:
+            df, cached_stats = self._prepare(articles)
+            self._summary_report_html_df(df, stats or cached_stats, save_path)
+    
+    def _summary_report_html_df(self, df: pd.DataFrame, stats: Dict, save_path: str = None) -> None:
+        """Build the summary report with Plotly subplots; nothing goes through matplotlib"""
+        if df.empty or 'sentiment_label' not in df.columns:
+            logger.warning("No sentiment labels available for summary report")
+            return
         
-        # Calculate statistics
-        total_articles = len(articles)
-        sentiment_counts = df['sentiment_label'].value_counts()
-        avg_score = df['sentiment_score'].mean()
+        total_articles = len(df)
+        sentiment_counts = stats['sentiment_counts']
+        avg_score = stats['avg_score']
         
-        # Create figure with subplots
-        fig = plt.figure(figsize=(16, 10))
-        gs = fig.add_gridspec(3, 2, hspace=0.3, wspace=0.3)
+        fig = make_subplots(
+            rows=2, cols=2,
+            specs=[[{'type': 'pie'}, {'type': 'xy'}],
+                   [{'type': 'xy', 'colspan': 2}, None]],
+            subplot_titles=('Sentiment Distribution', 'Sentiment by Source',
+                            'Sentiment Score Distribution')
+        )
         
         # 1. Sentiment Distribution
-        ax1 = fig.add_subplot(gs[0, 0])
-        sentiment_counts.plot(kind='pie', ax=ax1, autopct='%1.1f%%',
-                            colors=['#e74c3c','#2ecc71', '#95a5a6'])
-        ax1.set_title('Sentiment Distribution', fontweight='bold')
-        ax1.set_ylabel('')
+        fig.add_trace(go.Pie(
+            labels=sentiment_counts.index.astype(str),
+            values=sentiment_counts.to_numpy(),
+            marker={'colors': [self.SENTIMENT_COLORS.get(label, '#95a5a6')
+                               for label in sentiment_counts.index]},
+            sort=False,
+            showlegend=False
+        ), row=1, col=1)
         
         # 2. Sentiment by Source
-        ax2 = fig.add_subplot(gs[0, 1])
-        if 'source' in df.columns:
-            ct = pd.crosstab(df['source'], df['sentiment_label'])
-            ct.plot(kind='bar', ax=ax2, stacked=False)
-            ax2.set_title('Sentiment by Source', fontweight='bold')
-            ax2.set_xlabel('Source')
-            ax2.set_ylabel('Count')
-            ax2.legend(title='Sentiment')
-            ax2.tick_params(axis='x', rotation=45)
-        
-        # 3. Score Distribution
-        ax3 = fig.add_subplot(gs[1, :])
-        ax3.hist(df['sentiment_score'], bins=30, color='#3498db', 
-                edgecolor='black', alpha=0.7)
-        ax3.set_title('Sentiment Score Distribution', fontweight='bold')
-        ax3.set_xlabel('Score')
-        ax3.set_ylabel('Frequency')
-        ax3.axvline(avg_score, color='red', linestyle='--', linewidth=2,
-                   label=f'Mean: {avg_score:.3f}')
-        ax3.legend()
+        ct = stats['crosstab_source']
+        if ct is not None:
+            for label in ct.columns:
+                fig.add_trace(go.Bar(
+                    x=ct.index.astype(str),
+                    y=ct[label].to_numpy(),
+                    name=str(label),
+                    marker_color=self.SENTIMENT_COLORS.get(label, '#95a5a6')
+                ), row=1, col=2)
+            fig.update_xaxes(title_text='Source', row=1, col=2)
+            fig.update_yaxes(title_text='Count', row=1, col=2)
+        
+        # 3. Score Distribution, drawn from the precomputed bins
+        counts, edges = stats['score_histogram']
+        fig.add_trace(go.Bar(
+            x=(edges[:-1] + edges[1:]) / 2,
+            y=counts,
+            width=np.diff(edges),
+            marker_color='#3498db',
+            name='Scores',
+            showlegend=False
+        ), row=2, col=1)
+        # add_vline(row=, col=) trips over the Pie trace (it has no xaxis), so the mean
+        # line is a shape on whichever axes the histogram cell was given
+        cell = fig.get_subplot(2, 1)
+        xref = cell.xaxis.plotly_name.replace('axis', '')
+        yref = cell.yaxis.plotly_name.replace('axis', '') + ' domain'
+        fig.add_shape(type='line', xref=xref, yref=yref, x0=avg_score, x1=avg_score,
+                      y0=0, y1=1, line={'color': 'red', 'dash': 'dash', 'width': 2})
+        fig.add_annotation(xref=xref, yref=yref, x=avg_score, y=1, text=f'Mean: {avg_score:.3f}',
+                           showarrow=False, xanchor='left', yanchor='bottom')
+        fig.update_xaxes(title_text='Score', row=2, col=1)
+        fig.update_yaxes(title_text='Frequency', row=2, col=1)
+        fig.update_layout(barmode='group', legend_title_text='Sentiment', height=800)
         
         # 4. Summary Statistics
-        ax4 = fig.add_subplot(gs[2, :])
-        ax4.axis('off')
-        
-        summary_text = f"""
-        Summary Statistics
-        {'=' * 50}
-        Total Articles Analyzed: {total_articles}
-        Average Sentiment Score: {avg_score:.4f}
-        
-        Sentiment Breakdown:
-        {'-' * 50}
-        """
-        
+        lines = [
+            'Summary Statistics',
+            '=' * 50,
+            f'Total Articles Analyzed: {total_articles}',
+            f'Average Sentiment Score: {avg_score:.4f}',
+            '',
+            'Sentiment Breakdown:',
+            '-' * 50
+        ]
         for sentiment, count in sentiment_counts.items():
             percentage = (count / total_articles) * 100
-            summary_text += f"\n        {sentiment.capitalize()}: {count} ({percentage:.1f}%)"
+            lines.append(f'{str(sentiment).capitalize()}: {count} ({percentage:.1f}%)')
         
-        ax4.text(0.1, 0.5, summary_text, fontsize=12, family='monospace',
-                verticalalignment='center')
+        page = SUMMARY_REPORT_TEMPLATE.format(
+            figure=fig.to_html(include_plotlyjs=Config.PLOTLY_JS, full_html=False,
+                               config={'responsive': True}),
+            summary=html.escape('\n'.join(lines))
+        )
         
-        plt.suptitle('News Sentiment Analysis - Summary Report', 
-                    fontsize=18, fontweight='bold', y=0.98)
+        if save_path is None:
+            save_path = os.path.join(self.output_dir, 'summary_report.html')
         
-        save_path = os.path.join(self.output_dir, 'summary_report.png')
-        plt.savefig(save_path, dpi=Config.DPI, bbox_inches='tight')
+        self._replace_file(save_path, page.encode('utf-8'))
         logger.info(f"Summary report saved to {save_path}")
-        plt.close()
     
-    def generate_all_visualizations(self, articles: List[Dict]) -> None:
-        """Generate all available visualizations"""
-        logger.info("Generating all visualizations...")
+    def output_filenames(self, data_hash: str = None) -> Dict[str, str]:
+        """Filenames (within output_dir) for each plot, optionally tagged with a data hash"""
+        if not data_hash:
+            return dict(self.OUTPUT_FILES)
+        
+        filenames = {}
+        for name, filename in self.OUTPUT_FILES.items():
+            stem, ext = os.path.splitext(filename)
+            filenames[name] = f"{stem}_{data_hash}{ext}"
+        return filenames
+    
+    # Empty file written once every plot for a data hash has been rendered (or skipped
+    # for lack of data), so callers can tell a finished set from a missing one
+    GENERATED_MARKER = '.generated_'
+    
+    def _marker_path(self, data_hash: str) -> str:
+        return os.path.join(self.output_dir, f"{self.GENERATED_MARKER}{data_hash}")
+    
+    def has_outputs(self, data_hash: str) -> bool:
+        """Whether generate_all_visualizations has completed for this data hash"""
+        return os.path.exists(self._marker_path(data_hash))
+    
+    def _remove_stale_outputs(self, data_hash: str) -> None:
+        """Delete hashed plot files left over from older datasets"""
+        # Only finished (marked) sets older than the previous one are removed: the
+        # previous set may still be loading in a dashboard page, and a set without a
+        # marker may still be being written by a concurrent request
+        current_marker = self._marker_path(data_hash)
+        markers = sorted((path for path in glob.glob(self._marker_path('*')) if path != current_marker),
+                         key=os.path.getmtime)
+        stale = {os.path.basename(path)[len(self.GENERATED_MARKER):] for path in markers[:-1]}
+        if not stale:
+            return
         
-        self.plot_sentiment_distribution(articles)
-        self.plot_sentiment_by_source(articles)
-        self.plot_sentiment_scores(articles)
-        # self.create_wordcloud(articles, sentiment='all')
-        # self.create_wordcloud(articles, sentiment='positive')
-        # self.create_wordcloud(articles, sentiment='negative')
-        self.plot_interactive_timeline(articles)
-        self.create_summary_report(articles)
+        # Another request may be cleaning up at the same time
+        for filename in self.output_filenames().values():
+            stem, ext = os.path.splitext(filename)
+            for path in glob.glob(os.path.join(self.output_dir, f"{stem}_*{ext}")):
+                if os.path.basename(path)[len(stem) + 1:-len(ext)] in stale:
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(path)
+        # Markers last, so a set is never unmarked while its files remain
+        for path in markers[:-1]:
+            with contextlib.suppress(FileNotFoundError):
+                os.remove(path)
+    
+    @staticmethod
+    def _render_parallel(tasks: List[tuple], workers: int) -> List[tuple]:
+        """Render tasks in worker processes; returns the ones that still need rendering"""
+        failed = []
+        try:
+            # pyplot isn't thread-safe, so each plot renders in its own process.
+            # 'spawn' rather than fork, since the web app has Mongo and executor threads running.
+            context = multiprocessing.get_context('spawn')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as executor:
+                futures = [(task, executor.submit(_run_plot, task)) for task in tasks]
+                for task, future in futures:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        logger.warning(f"Parallel render of {task[0]} failed, retrying serially: {e}")
+                        failed.append(task)
+        except Exception as e:
+            logger.warning(f"Parallel plotting failed, rendering serially: {e}")
+            return tasks
+        return failed
+    
+    def generate_all_visualizations(self, articles: Union[List[Dict], pd.DataFrame], data_hash: str = None,
+                                    parallel: bool = False) -> None:
+        """Generate all available visualizations"""
+        # len() rather than truthiness so a DataFrame works too
+        if articles is None or len(articles) == 0:
+            logger.warning("No articles; skipping visualizations")
+            return
         
-        logger.info(f"All visualizations saved to {self.output_dir}")
\ No newline at end of file
+        logger.info("Generating all visualizations...")
+        with self._lock:
+            paths = {name: os.path.join(self.output_dir, filename)
+                     for name, filename in self.output_filenames(data_hash).items()}
+            
+            # Build the DataFrame and shared aggregates once for every plot (dropping any
+            # cached copy first, in case the caller mutated the same list since)
+            self._cache = {}
+            df, stats = self._prepare(articles)
+            tasks = [(name, df, stats, paths[name]) for name in self.PLOT_METHODS]
+            # self.create_wordcloud(articles, sentiment='all')
+            # self.create_wordcloud(articles, sentiment='positive')
+            # self.create_wordcloud(articles, sentiment='negative')
+            
+            # Serial by default: spawn workers re-import the caller's __main__ (app.py opens
+            # Mongo, main.py pulls in torch) and a fresh pool per call costs more than five
+            # small charts, so parallel rendering is opt-in for large batch runs only
+            workers = min(len(tasks), Config.VISUALIZATION_WORKERS)
+            if parallel and workers > 1:
+                tasks = self._render_parallel(tasks, workers)
+            
+            for task in tasks:
+                _run_plot(task, self)
+            
+            if data_hash:
+                open(self._marker_path(data_hash), 'w').close()
+                self._remove_stale_outputs(data_hash)
+        
+        logger.info(f"All visualizations saved to {self.output_dir}")
+
+
+def _run_plot(task: tuple, visualizer: SentimentVisualizer = None) -> None:
+    """Render one (name, df, stats, save_path) plot task; module-level so workers can unpickle it"""
+    name, df, stats, save_path = task
+    owned = visualizer is None
+    if owned:
+        visualizer = SentimentVisualizer()
+    try:
+        getattr(visualizer, SentimentVisualizer.PLOT_METHODS[name])(df, stats, save_path=save_path)
+    finally:
+        # A worker's throwaway visualizer shouldn't leave its figure registered with pyplot
+        if owned:
+            visualizer.close()
\ No newline at end of file